@@ -1,8 +1,11 @@
 from flask import Flask
 import logging
 from app.config.config import Config
-from app.extensions import init_postgres, init_mongo, init_jwt, init_redis
-from app.controllers import auth_api, todo_list_api, todo_item_api
+from app.extensions import init_postgres, init_mongo, init_jwt, init_redis, init_hashing, init_rate_limit, init_metrics, \
+    init_tracing, init_profiler
+from app.controllers import auth_api, todo_list_api, todo_item_api, health_api
+from app.cli import init_cli
+from app.services.cascade_service import cascade_worker
 
 
 def create_app(config_class=Config):
@@ -13,16 +16,28 @@ def create_app(config_class=Config):
     # 禁用 Flask-RESTful 的默认错误处理，避免循环
     app.config['PROPAGATE_EXCEPTIONS'] = True
 
-    # initialize extensions
+    # initialize extensions (metrics first: pymongo listeners only apply to clients created afterwards)
+    init_metrics(app)
+    init_tracing(app)
     init_redis(app)
     init_postgres(app)
     init_mongo(app)
     init_jwt(app)
+    init_hashing(app)
+    init_rate_limit(app)
+    init_profiler(app)
 
     # register controller, route
     auth_api.init_app(app)
     todo_list_api.init_app(app)
     todo_item_api.init_app(app)
+    health_api.init_app(app)
+
+    # register cli commands
+    init_cli(app)
+
+    # background workers
+    cascade_worker.init_app(app)
 
     # app.logger.debug("debug mode...")
     # app.logger.info("Flask app info...")
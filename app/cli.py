@@ -0,0 +1,40 @@
+import json
+from flask import current_app
+from app.extensions.db.mongo_indexes import report_indexes
+from app.services.todo_service import TodoItemService, ListCounterService
+from app.services.cascade_service import build_cascade_service
+
+
+def init_cli(app):
+    """注册 flask 命令行工具（运维 / 数据迁移）"""
+
+    @app.cli.command("mongo-indexes")
+    def mongo_indexes_command():
+        """report missing / unused / unregistered mongo indexes"""
+        print(json.dumps(report_indexes(current_app.mongo_db), indent=2))
+
+    @app.cli.command("backfill-sort-ranks")
+    def backfill_sort_ranks_command():
+        """set status_rank / priority_rank on existing todo items"""
+        modified = TodoItemService.backfill_sort_ranks(current_app.mongo_db["todo_items"])
+        print(f"{modified} items updated")
+
+    @app.cli.command("sweep-orphan-items")
+    def sweep_orphan_items_command():
+        """delete todo items whose list no longer exists"""
+        service = build_cascade_service(current_app)
+        orphan_ids = service.sweep_orphans()
+        print(f"{len(orphan_ids)} orphan lists found")
+        print(f"{service.run_pending()} items deleted")
+
+    @app.cli.command("backfill-list-counters")
+    def backfill_list_counters_command():
+        """REQUIRED ONCE ON UPGRADE: compute item counts of lists created before the counts field existed"""
+        service = ListCounterService(current_app.mongo_db["todo_lists"])
+        print(f"{service.backfill(current_app.mongo_db['todo_items'])} lists backfilled")
+
+    @app.cli.command("reconcile-list-counters")
+    def reconcile_list_counters_command():
+        """recompute the denormalized item counts of every list and repair drift (also backfills missing counts)"""
+        service = ListCounterService(current_app.mongo_db["todo_lists"])
+        print(f"{service.reconcile(current_app.mongo_db['todo_items'])} lists repaired")
@@ -14,6 +14,12 @@ class Config:
     POSTGRES_HOST: str = os.getenv("POSTGRES_HOST", "localhost")
     POSTGRES_PORT: str = os.getenv("POSTGRES_PORT", "5432")
     POSTGRES_URI: str = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+    # connection pool
+    POSTGRES_POOL_SIZE: int = int(os.getenv("POSTGRES_POOL_SIZE", "10"))
+    POSTGRES_MAX_OVERFLOW: int = int(os.getenv("POSTGRES_MAX_OVERFLOW", "20"))
+    POSTGRES_POOL_TIMEOUT: float = float(os.getenv("POSTGRES_POOL_TIMEOUT", "10"))
+    POSTGRES_POOL_RECYCLE: int = int(os.getenv("POSTGRES_POOL_RECYCLE", "1800"))
+    POSTGRES_POOL_PRE_PING: bool = os.getenv("POSTGRES_POOL_PRE_PING", "true").lower() == "true"
 
     # MongoDB：load from .env
     MONGO_USER: str = os.getenv("MONGO_USER")
@@ -22,6 +28,8 @@ class Config:
     MONGO_PORT: str = os.getenv("MONGO_PORT")
     MONGO_DB: str = os.getenv("MONGO_DB")
     MONGO_AUTH_DB: str = os.getenv("MONGO_AUTH_DB")
+    # create registered indexes on startup (see app/extensions/db/mongo_indexes.py)
+    MONGO_ENSURE_INDEXES: bool = os.getenv("MONGO_ENSURE_INDEXES", "true").lower() == "true"
 
     REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
     REDIS_PORT: str = os.getenv("REDIS_PORT")
@@ -32,6 +40,26 @@ class Config:
     CACHE_REDIS_DB: str = os.getenv("CACHE_REDIS_DB")
     CACHE_KEY_PREFIX: str = os.getenv("CACHE_KEY_PREFIX")
     CACHE_DEFAULT_TIMEOUT: str = os.getenv("CACHE_DEFAULT_TIMEOUT")
+    # permission cache ttl(seconds), keyed by (user_id, list_id)
+    PERMISSION_CACHE_TIMEOUT: int = int(os.getenv("PERMISSION_CACHE_TIMEOUT", "300"))
+    # list/item response cache ttl(seconds), invalidated by per-list generation tags
+    RESPONSE_CACHE_TIMEOUT: int = int(os.getenv("RESPONSE_CACHE_TIMEOUT", "600"))
+    # in-process L1 cache in front of redis, 0 to disable
+    L1_CACHE_SIZE: int = int(os.getenv("L1_CACHE_SIZE", "10000"))
+    L1_CACHE_TTL: int = int(os.getenv("L1_CACHE_TTL", "30"))
+    L1_CACHE_CHANNEL: str = os.getenv("L1_CACHE_CHANNEL", "cache:invalidate")
+
+    # CHANGE FEED (server-sent events per list)
+    CHANGE_FEED_CHANNEL: str = os.getenv("CHANGE_FEED_CHANNEL", "list:changes")
+    # max pending events per connection, a slower client gets a `resync` event instead
+    SSE_MAX_QUEUE: int = int(os.getenv("SSE_MAX_QUEUE", "100"))
+    SSE_HEARTBEAT: int = int(os.getenv("SSE_HEARTBEAT", "15"))
+    # connections are closed after this many seconds, EventSource reconnects automatically
+    SSE_MAX_DURATION: int = int(os.getenv("SSE_MAX_DURATION", "3600"))
+    # open event streams per process, further connections get 503 + Retry-After.
+    # with threaded workers (flask run / gunicorn gthread) every stream holds a thread for up to SSE_MAX_DURATION,
+    # keep this below the worker's thread count; raise it only with an async worker (gunicorn -k gevent)
+    SSE_MAX_CONNECTIONS: int = int(os.getenv("SSE_MAX_CONNECTIONS", "100"))
 
     # FLASK
     FLASK_APP: str = os.getenv("FLASK_APP", "app/__init__.py")
@@ -39,6 +67,74 @@ class Config:
     API_PORT: int = int(os.getenv("API_PORT", "5000"))
     API_PREFIX: str = "/api"
 
+    # PAGINATION
+    DEFAULT_PAGE_SIZE: int = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+    MAX_PAGE_SIZE: int = int(os.getenv("MAX_PAGE_SIZE", "200"))
+    # max items per bulk request
+    BULK_MAX_ITEMS: int = int(os.getenv("BULK_MAX_ITEMS", "1000"))
+    # mongo cursor batch size of the streaming export
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+    # streaming import: rows per insert_many, max per-row errors kept in the report
+    IMPORT_CHUNK_SIZE: int = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+    IMPORT_MAX_ERRORS: int = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+
+    # DELTA SYNC
+    # tombstones of deleted items/lists expire after this many seconds (mongo TTL index),
+    # clients whose `since` cursor is older must do a full resync
+    TOMBSTONE_TTL: int = int(os.getenv("TOMBSTONE_TTL", str(30 * 24 * 3600)))
+    # the next `since` cursor lags this many seconds behind now, so writes that commit late are not skipped
+    SYNC_CLOCK_SKEW: int = int(os.getenv("SYNC_CLOCK_SKEW", "5"))
+
+    # CASCADE DELETE (items of deleted lists are removed by a background worker)
+    CASCADE_WORKER_ENABLED: bool = os.getenv("CASCADE_WORKER_ENABLED", "true").lower() == "true"
+    CASCADE_BATCH_SIZE: int = int(os.getenv("CASCADE_BATCH_SIZE", "1000"))
+    CASCADE_BATCH_PAUSE: float = float(os.getenv("CASCADE_BATCH_PAUSE", "0.05"))
+    CASCADE_POLL_INTERVAL: int = int(os.getenv("CASCADE_POLL_INTERVAL", "30"))
+    CASCADE_LEASE_SECONDS: int = int(os.getenv("CASCADE_LEASE_SECONDS", "300"))
+
+    # RATE LIMIT (token buckets in redis, "capacity/seconds", empty to disable a bucket)
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_PER_IP: str = os.getenv("RATE_LIMIT_PER_IP", "1200/60")
+    RATE_LIMIT_PER_USER: str = os.getenv("RATE_LIMIT_PER_USER", "600/60")
+    # per route buckets keyed by user (or ip when anonymous), "endpoint=capacity/seconds,..."
+    RATE_LIMIT_ROUTES: str = os.getenv("RATE_LIMIT_ROUTES", "login=100/60,register=100/600,todoitemcollection=300/60")
+    # redis socket timeout (seconds) of the limiter, after a failure the in-process fallback is used for
+    # RATE_LIMIT_REDIS_RETRY seconds
+    RATE_LIMIT_REDIS_TIMEOUT: float = float(os.getenv("RATE_LIMIT_REDIS_TIMEOUT", "0.05"))
+    RATE_LIMIT_REDIS_RETRY: float = float(os.getenv("RATE_LIMIT_REDIS_RETRY", "5"))
+
+    # PASSWORD HASHING (bcrypt in a bounded process pool)
+    # work factor for new hashes, existing hashes with another cost are re-hashed on login
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    # hashing processes per WSGI worker process, 0 = hash on the request thread, -1 = cpu count.
+    # every gunicorn worker starts its own pool, so -1 with N workers runs N x cpu_count hashing processes;
+    # keep workers x BCRYPT_POOL_SIZE <= cpu count
+    BCRYPT_POOL_SIZE: int = int(os.getenv("BCRYPT_POOL_SIZE", "1"))
+    # queued + running hashes before new logins fail fast with 503, 0 = 4 x pool size
+    BCRYPT_MAX_PENDING: int = int(os.getenv("BCRYPT_MAX_PENDING", "0"))
+    BCRYPT_TIMEOUT: float = float(os.getenv("BCRYPT_TIMEOUT", "10"))
+
+    # METRICS (prometheus text format, set PROMETHEUS_MULTIPROC_DIR when running several worker processes)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_PATH: str = os.getenv("METRICS_PATH", "/metrics")
+    # bearer token of the prometheus scraper, ADMIN JWTs are accepted as well
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN")
+    # per-layer durations (jwt, perm, redis, pg, mongo, ...) in the Server-Timing response header,
+    # only sent to requests with an ADMIN token (it reveals internals and timing differences)
+    SERVER_TIMING_ENABLED: bool = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+    # fraction of requests logged as JSON traces (logger "app.trace") with every span, 0 = off
+    TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+    # on-demand profiling of single requests by ADMIN tokens (?_profile=sample|cprofile or a signed X-Profile header)
+    PROFILER_ENABLED: bool = os.getenv("PROFILER_ENABLED", "false").lower() == "true"
+    PROFILER_DIR: str = os.getenv("PROFILER_DIR", "/tmp/todo-profiles")
+    # retention of PROFILER_DIR, older / extra profiles are deleted whenever a new one is saved
+    PROFILER_MAX_FILES: int = int(os.getenv("PROFILER_MAX_FILES", "50"))
+    PROFILER_MAX_AGE: int = int(os.getenv("PROFILER_MAX_AGE", str(7 * 24 * 3600)))
+    # key of the X-Profile header signature, the header trigger is disabled when empty
+    PROFILER_SECRET: str = os.getenv("PROFILER_SECRET")
+    # stack sampling interval (seconds) of the sample mode
+    PROFILER_INTERVAL: float = float(os.getenv("PROFILER_INTERVAL", "0.001"))
+
     # JWT
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY")
     JWT_ACCESS_TOKEN_EXPIRES: int = 36000  # expired by 1 days
@@ -1,3 +1,4 @@
 from .auth_controller import api as auth_api
 from .todo_list_controller import api as todo_list_api
-from .todo_item_controller import api as todo_item_api
\ No newline at end of file
+from .todo_item_controller import api as todo_item_api
+from .health_controller import api as health_api
@@ -4,9 +4,11 @@ from app.dto.user_dto import UserCreateDTO, UserLoginDTO
 from app.services.user_service import UserService
 from app.extensions.db.db_postgres import get_db
 from app.utils.error_handlers import handle_exceptions
+from app.utils.json_encoder import output_json
 from flask import request
 
 api = Api(prefix="/api/auth")
+api.representations["application/json"] = output_json
 
 
 def init_app(app):
@@ -22,7 +24,7 @@ class Register(Resource):
         Returns:
 
         """
-        user_service = UserService(next(get_db()))
+        user_service = UserService(get_db())
         user = user_service.register_user(UserCreateDTO(**request.get_json()))
         access_token = create_access_token(
             identity=user.id,
@@ -58,7 +60,7 @@ class Login(Resource):
         login_data = UserLoginDTO(**request.get_json())
 
         # 2, query from database
-        user_service = UserService(next(get_db()))
+        user_service = UserService(get_db())
         user = user_service.login_user(login_data)
 
         access_token = create_access_token(
@@ -0,0 +1,61 @@
+import os
+from flask import current_app, send_from_directory
+from flask_restful import Resource, Api
+from flask_jwt_extended import jwt_required, get_jwt
+from app.extensions.db.db_postgres import get_pool_stats
+from app.models.users import UserRole
+from app.utils.error_handlers import handle_exceptions
+from app.utils.json_encoder import output_json
+from app.utils.errors import ForbiddenError, ResourceNotFoundError
+
+api = Api(prefix="/api/health")
+api.representations["application/json"] = output_json
+
+
+def init_app(app):
+    api.init_app(app)
+
+
+def require_admin():
+    """只允许 ADMIN 角色访问运维类接口"""
+    if get_jwt().get("role") != UserRole.ADMIN.value:
+        raise ForbiddenError("Admin permission required")
+
+
+class PoolStats(Resource):
+    @jwt_required()
+    @handle_exceptions
+    def get(self):
+        """
+        PostgreSQL Connection Pool Statistics (admin only)
+        {{base_url}}/api/health/pool
+        Returns:
+
+        """
+        require_admin()
+        return {
+            "code": 200,
+            "data": {
+                "postgres": get_pool_stats()
+            }
+        }, 200
+
+
+class Profile(Resource):
+    @jwt_required()
+    @handle_exceptions
+    def get(self, profile_id: str):
+        """
+        Download a request profile (admin only), profile_id is the X-Profile-Id header of the profiled response
+        {{base_url}}/api/health/profiles/{{profile_id}}
+        Returns: folded stacks (.folded) or pstats (.prof)
+        """
+        require_admin()
+        directory = current_app.config["PROFILER_DIR"]
+        if not os.path.isfile(os.path.join(directory, os.path.basename(profile_id))):
+            raise ResourceNotFoundError(f"Profile {profile_id} not found")
+        return send_from_directory(directory, os.path.basename(profile_id), as_attachment=True)
+
+
+api.add_resource(PoolStats, "/pool")
+api.add_resource(Profile, "/profiles/<string:profile_id>")
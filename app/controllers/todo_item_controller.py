@@ -1,21 +1,29 @@
-from flask import request, jsonify
+from flask import request, jsonify, current_app, Response
+from pydantic import ValidationError
 from flask_restful import Resource, Api
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy.orm import Session
 from pymongo.collection import Collection
-from datetime import datetime
-from app.dto.todo_dto import TodoItemCreateDTO, TodoItemUpdateDTO
-from app.models.todos import TodoItem, TodoStatus, TodoPriority
+from datetime import datetime, timedelta
+import uuid
+from app.dto.todo_dto import TodoItemCreateDTO, TodoItemUpdateDTO, TodoItemBulkSelectDTO, TodoItemBulkUpdateDTO
+from app.models.todos import TodoStatus, TodoPriority
 from app.models.users import PermType
-from app.services.todo_service import TodoItemService, TodoListService
+from app.services.todo_service import TodoItemService, TodoListService, TombstoneService
 from app.services.user_service import UserService
+from app.services.import_service import build_import_service, iter_rows
 from app.extensions.db.db_postgres import get_db
 from app.extensions.db.db_mongo import get_mongo_collection
-from app.utils.error_handlers import handle_exceptions
-from app.utils.errors import ResourceNotFoundError
-from app.utils.json_encoder import process_data
+from app.utils.error_handlers import handle_exceptions, format_validation_error
+from app.utils.errors import ResourceNotFoundError, BadRequestError, ForbiddenError, GoneError
+from app.utils.json_encoder import output_json
+from app.utils.pagination import encode_cursor, decode_cursor, get_page_limit
+from app.utils.list_cache import ResponseKeys, cached_response, cached_not_modified, get_list_generation
+from app.utils.etag import version_etag, generation_etag, not_modified, get_if_match_version
+from app.utils.streaming import ndjson_chunks, gzip_chunks
 
 api = Api(prefix="/api/lists/<string:list_id>/items")
+api.representations["application/json"] = output_json
 
 
 def init_app(app):
@@ -38,7 +46,7 @@ class TodoItemCollection(Resource):
         item_create = TodoItemCreateDTO(**data)
 
         # 2, check permissions
-        db: Session = next(get_db())
+        db: Session = get_db()
         user_service = UserService(db)
         user_service.check_list_permission(user_id, list_id, PermType.EDIT)
 
@@ -48,30 +56,22 @@ class TodoItemCollection(Resource):
 
         # 创建项
         item_coll: Collection = get_mongo_collection("todo_items")
-        item_service = TodoItemService(item_coll)
-
-        new_item = item_service.create_item(TodoItem(
-            list_id=list_id,
-            title=item_create.title,
-            description=item_create.description,
-            due_date=item_create.due_date,
-            status=TodoStatus(item_create.status) if item_create.status else TodoStatus.NOT_STARTED,
-            priority=TodoPriority(item_create.priority) if item_create.priority else TodoPriority.MEDIUM,
-            tags=item_create.tags
-        ))
+        item_service = TodoItemService(item_coll, lists=list_coll)
+
+        new_item = item_service.create_item(TodoItemService.build_item(list_id, item_create))
 
         return {
             "code": 200,
             "message": "Item created",
-            "data": process_data(new_item.model_dump())
+            "data": new_item.model_dump()
         }, 201
 
     @jwt_required()
     @handle_exceptions
     def get(self, list_id: str):
         """
-        Get All Items in List (with Filtering)
-        {{base_url}}/api/lists/{{list_id}}/items?priority=High&due_date=&sort_by=due_date
+        Get All Items in List (with Filtering, keyset pagination)
+        {{base_url}}/api/lists/{{list_id}}/items?priority=High&due_date=&sort_by=due_date&limit=50&cursor=
         Args:
             list_id:
             status:
@@ -79,10 +79,16 @@ class TodoItemCollection(Resource):
             due_date:
             sort_by:
             order:
+            limit: page size
+            cursor: opaque cursor returned as `pagination.next_cursor` by the previous page
+            since: delta sync, see `get_changes`
+            If-None-Match: (header, optional) ETag of the cached page, 304 if nothing in the list changed
         Returns:
         """
         user_id = get_jwt_identity()
-        db: Session = next(get_db())
+        if "since" in request.args:
+            return self.get_changes(user_id, list_id)
+        db: Session = get_db()
         user_service = UserService(db)
         # query the item
         status = request.args.get("status")
@@ -90,22 +96,295 @@ class TodoItemCollection(Resource):
         due_date = datetime.strptime(due_date_str, "%Y-%m-%d") if due_date_str else None
         sort_by = request.args.get("sort_by", "due_date")
         order = request.args.get("order", "asc")
-        item_coll: Collection = get_mongo_collection("todo_items")
-        item_service = TodoItemService(item_coll)
-
-        items = item_service.list_items(
-            list_id=list_id,
-            status=TodoStatus(status) if status else None,
-            due_date=due_date,
-            sort_by=sort_by,
-            order=order
+        limit = get_page_limit(request.args.get("limit"))
+        cursor = decode_cursor(request.args.get("cursor"), {"sort_by": str, "order": str, "values": list})
+        sort_field = TodoItemService.resolve_sort_field(sort_by)
+        # 游标只在相同的排序条件下有效
+        if cursor and (cursor["sort_by"] != sort_field or cursor["order"] != order.lower()
+                       or len(cursor["values"]) != len(TodoItemService.SORT_KEYS[sort_field])):
+            raise BadRequestError("Cursor does not match the current sort order")
+
+        user_service.check_list_permission(user_id, list_id, PermType.VIEW)
+
+        # 列表代数即版本号：没有写操作时直接 304
+        generation = get_list_generation(list_id)
+        etag = generation_etag(generation)
+        response = not_modified(etag)
+        if response:
+            return response
+
+        def build():
+            item_service = TodoItemService(get_mongo_collection("todo_items"))
+            items = item_service.list_items(
+                list_id=list_id,
+                status=TodoStatus(status) if status else None,
+                due_date=due_date,
+                sort_by=sort_field,
+                order=order,
+                limit=limit + 1,
+                after=cursor
+            )
+            has_more = len(items) > limit
+            items = items[:limit]
+
+            next_cursor = None
+            if has_more:
+                next_cursor = encode_cursor({
+                    "sort_by": sort_field,
+                    "order": order.lower(),
+                    **TodoItemService.page_cursor(items[-1], sort_field)
+                })
+
+            return {
+                "code": 200,
+                "data": [item.model_dump() for item in items],
+                "pagination": {
+                    "limit": limit,
+                    "next_cursor": next_cursor
+                }
+            }
+
+        return cached_response(ResponseKeys(list_id, generation), build), 200, {"ETag": etag}
+
+    @staticmethod
+    def get_changes(user_id, list_id: str):
+        """
+        Delta Sync: items created / changed and ids of items deleted since the last sync
+        {{base_url}}/api/lists/{{list_id}}/items?since=&limit=200
+        Args:
+            since: `sync.next_since` of the previous response, empty for the first sync
+            limit: page size, keep polling while `sync.has_more` is true
+        Returns:
+            data: changed items ordered by updated_at, deleted: ids of deleted items.
+            consecutive pages may overlap, clients should apply them idempotently (upsert by item_id).
+            410 when the list was deleted or `since` is older than the tombstone TTL (full resync needed)
+        """
+        limit = get_page_limit(request.args.get("limit"))
+        since = decode_cursor(request.args.get("since"), {"updated_at": datetime, "item_id": str})
+        now = datetime.utcnow()
+        if since and since["updated_at"] < now - timedelta(seconds=current_app.config["TOMBSTONE_TTL"]):
+            raise GoneError("Sync cursor expired, do a full sync")
+
+        user_service = UserService(get_db())
+        tombstones = TombstoneService(get_mongo_collection("tombstones"))
+        try:
+            user_service.check_list_permission(user_id, list_id, PermType.VIEW)
+        except ForbiddenError:
+            if since and tombstones.list_deleted(list_id):
+                raise GoneError(f"List {list_id} has been deleted")
+            raise
+
+        item_service = TodoItemService(get_mongo_collection("todo_items"))
+        items = item_service.list_changes(list_id, after=since, limit=limit + 1)
+        has_more = len(items) > limit
+        items = items[:limit]
+
+        if has_more:
+            until = items[-1].updated_at
+            next_since = {"updated_at": until, "item_id": items[-1].item_id}
+        else:
+            # 追上最新数据后游标回退 SYNC_CLOCK_SKEW 秒，晚提交的写入会在下次同步时补上
+            until = now
+            next_since = {"updated_at": now - timedelta(seconds=current_app.config["SYNC_CLOCK_SKEW"]), "item_id": ""}
+            if since and since["updated_at"] > next_since["updated_at"]:
+                next_since = since
+        deleted = tombstones.deleted_item_ids(list_id, since["updated_at"], until) if since else []
+
+        return {
+            "code": 200,
+            "data": [item.model_dump() for item in items],
+            "deleted": deleted,
+            "sync": {
+                "limit": limit,
+                "has_more": has_more,
+                "next_since": encode_cursor(next_since)
+            }
+        }, 200
+
+    @jwt_required()
+    @handle_exceptions
+    def patch(self, list_id: str):
+        """
+        Bulk Update Items
+        {{base_url}}/api/lists/{{list_id}}/items
+        Body:
+            {"item_ids": [...], "update": {TodoItemUpdateDTO}}
+            or {"filter": {"status": "In Progress", "priority": "High", "due_date": "..."}, "update": {...}}
+        Returns:
+            matched / modified counts
+        """
+        user_id = get_jwt_identity()
+        bulk = TodoItemBulkUpdateDTO(**request.get_json())
+        update_data = bulk.update.model_dump(exclude_none=True)
+        if not update_data:
+            raise BadRequestError("update must contain at least one field")
+
+        user_service = UserService(get_db())
+        user_service.check_list_permission(user_id, list_id, PermType.EDIT)
+
+        item_service = TodoItemService(get_mongo_collection("todo_items"), lists=get_mongo_collection("todo_lists"))
+        matched, modified = item_service.update_items(
+            list_id,
+            update_data,
+            item_ids=bulk.item_ids,
+            filters=bulk.filter.model_dump(exclude_none=True) if bulk.filter else None
+        )
+        return {
+            "code": 200,
+            "message": f"{modified} items updated",
+            "data": {"matched": matched, "modified": modified}
+        }, 200
+
+    @jwt_required()
+    @handle_exceptions
+    def delete(self, list_id: str):
+        """
+        Bulk Delete Items
+        {{base_url}}/api/lists/{{list_id}}/items
+        Body:
+            {"item_ids": [...]} or {"filter": {"status": "Completed"}}
+        Returns:
+            deleted count
+        """
+        user_id = get_jwt_identity()
+        bulk = TodoItemBulkSelectDTO(**request.get_json())
+
+        user_service = UserService(get_db())
+        user_service.check_list_permission(user_id, list_id, PermType.EDIT)
+
+        item_service = TodoItemService(get_mongo_collection("todo_items"), get_mongo_collection("tombstones"),
+                                       get_mongo_collection("todo_lists"))
+        deleted = item_service.delete_items(
+            list_id,
+            item_ids=bulk.item_ids,
+            filters=bulk.filter.model_dump(exclude_none=True) if bulk.filter else None
         )
+        return {
+            "code": 200,
+            "message": f"{deleted} items deleted",
+            "data": {"deleted": deleted}
+        }, 200
+
+
+class TodoItemBulk(Resource):
+    @jwt_required()
+    @handle_exceptions
+    def post(self, list_id: str):
+        """
+        Bulk Create Items
+        {{base_url}}/api/lists/{{list_id}}/items/bulk
+        Body:
+            {"items": [TodoItemCreateDTO, ...]} or a bare [TodoItemCreateDTO, ...]  (at most BULK_MAX_ITEMS)
+        Returns:
+            per-item results in request order, 201 if every item was created, 207 otherwise
+        """
+        user_id = get_jwt_identity()
+        payload = request.get_json(silent=True)
+        if isinstance(payload, list):
+            raw_items = payload
+        elif isinstance(payload, dict):
+            raw_items = payload.get("items")
+        else:
+            raise BadRequestError("Body must be a JSON object with items or a JSON array")
+        if not isinstance(raw_items, list) or not raw_items:
+            raise BadRequestError("items must be a non-empty list")
+        max_items = current_app.config["BULK_MAX_ITEMS"]
+        if len(raw_items) > max_items:
+            raise BadRequestError(f"At most {max_items} items per request")
+
+        # 1, check permission and list once for the whole batch
+        user_service = UserService(get_db())
+        user_service.check_list_permission(user_id, list_id, PermType.EDIT)
+        list_service = TodoListService(get_mongo_collection("todo_lists"))
+        if not list_service.list_exists(list_id):
+            raise ResourceNotFoundError(f"List {list_id} not found")
+
+        # 2, validate every item, invalid ones are reported and skipped
+        results = [None] * len(raw_items)
+        valid = []
+        for index, raw in enumerate(raw_items):
+            try:
+                valid.append((index, TodoItemService.build_item(list_id, TodoItemCreateDTO(**raw))))
+            except (ValidationError, ValueError, TypeError) as e:
+                results[index] = {"index": index, "code": 400, "message": format_validation_error(e)}
+
+        # 3, one unordered insert_many
+        item_service = TodoItemService(get_mongo_collection("todo_items"), lists=get_mongo_collection("todo_lists"))
+        write_errors = item_service.create_items([item for _, item in valid])
+        for position, (index, item) in enumerate(valid):
+            if position in write_errors:
+                results[index] = {"index": index, "code": 409, "message": write_errors[position]["errmsg"]}
+            else:
+                results[index] = {"index": index, "code": 201, "item_id": item.item_id}
+
+        created = sum(1 for r in results if r["code"] == 201)
+        return {
+            "code": 200,
+            "message": f"{created} of {len(results)} items created",
+            "data": results
+        }, 201 if created == len(results) else 207
 
+
+class TodoItemExport(Resource):
+    @jwt_required()
+    @handle_exceptions
+    def get(self, list_id: str):
+        """
+        Export All Items in List as NDJSON (streaming)
+        {{base_url}}/api/lists/{{list_id}}/items/export
+        Args:
+            list_id:
+            Accept-Encoding: (header, optional) gzip to receive a gzip-compressed stream
+        Returns:
+            application/x-ndjson, one item per line
+        """
+        user_id = get_jwt_identity()
+        user_service = UserService(get_db())
         user_service.check_list_permission(user_id, list_id, PermType.VIEW)
 
+        batch_size = current_app.config["EXPORT_BATCH_SIZE"]
+        item_service = TodoItemService(get_mongo_collection("todo_items"))
+        chunks = ndjson_chunks(item_service.iter_items(list_id, batch_size), batch_size)
+
+        headers = {"Content-Disposition": f"attachment; filename={list_id}.ndjson"}
+        if "gzip" in request.accept_encodings:
+            chunks = gzip_chunks(chunks)
+            headers["Content-Encoding"] = "gzip"
+            headers["Vary"] = "Accept-Encoding"
+        return Response(chunks, status=200, mimetype="application/x-ndjson", headers=headers)
+
+
+class TodoItemImport(Resource):
+    @jwt_required()
+    @handle_exceptions
+    def post(self, list_id: str):
+        """
+        Import Items from NDJSON / CSV (streaming, resumable)
+        {{base_url}}/api/lists/{{list_id}}/items/import?format=ndjson&import_id=
+        Args:
+            list_id:
+            format: ndjson (default) or csv, the raw file is sent as request body
+            import_id: optional, resend the same file with the same import_id to resume after a failure
+        Returns:
+            import report: inserted / skipped / failed counts, per-row errors and the checkpoint
+        """
+        user_id = get_jwt_identity()
+        fmt = request.args.get("format", "ndjson").lower()
+        import_id = request.args.get("import_id") or f"import_{uuid.uuid4().hex}"
+
+        user_service = UserService(get_db())
+        user_service.check_list_permission(user_id, list_id, PermType.EDIT)
+        list_service = TodoListService(get_mongo_collection("todo_lists"))
+        if not list_service.list_exists(list_id):
+            raise ResourceNotFoundError(f"List {list_id} not found")
+
+        import_service = build_import_service(current_app, get_mongo_collection("todo_items"))
+        report = import_service.run(import_id, list_id, iter_rows(request.stream, fmt))
+
         return {
             "code": 200,
-            "data": process_data([item.model_dump() for item in items])
+            "message": f"{report['inserted']} items imported",
+            "data": report
         }, 200
 
 
@@ -119,22 +398,36 @@ class TodoItemResource(Resource):
         Args:
             list_id:
             item_id:
+            If-None-Match: (header, optional) ETag of the cached copy, 304 if it is still current
         Returns:
 
         """
         user_id = get_jwt_identity()
-        db: Session = next(get_db())
+        db: Session = get_db()
         user_service = UserService(db)
         user_service.check_list_permission(user_id, list_id, PermType.VIEW)
 
-        item_coll: Collection = get_mongo_collection("todo_items")
-        item_service = TodoItemService(item_coll)
-        item = item_service.get_item(item_id, list_id)
+        keys = ResponseKeys(list_id)
+        response = cached_not_modified(keys)
+        if response:
+            return response
 
-        return {
-            "code": 200,
-            "data": process_data(item.model_dump())
-        }, 200
+        def build():
+            item_service = TodoItemService(get_mongo_collection("todo_items"))
+            item = item_service.get_item(item_id, list_id)
+            return {
+                "code": 200,
+                "data": item.model_dump()
+            }
+
+        def etag_of(body: dict) -> str:
+            return version_etag(body["data"].get("version", 0))
+
+        body = cached_response(keys, build, etag_of)
+        response = not_modified(etag_of(body))
+        if response:
+            return response
+        return body, 200, {"ETag": etag_of(body)}
 
     @jwt_required()
     @handle_exceptions
@@ -145,11 +438,13 @@ class TodoItemResource(Resource):
         Args:
             list_id:
             item_id:
+            If-Match: (header, optional) ETag of the version being edited, 412 if it is stale
         Returns:
 
         """
         user_id = get_jwt_identity()
-        user_service = UserService(next(get_db()))
+        expected_version = get_if_match_version()
+        user_service = UserService(get_db())
         user_service.check_list_permission(user_id, list_id, PermType.EDIT)
 
         update_data = TodoItemUpdateDTO(**request.get_json()).model_dump(exclude_none=True)
@@ -160,14 +455,14 @@ class TodoItemResource(Resource):
             update_data["priority"] = TodoPriority(update_data["priority"])
 
         # query from mongo database
-        item_service = TodoItemService(get_mongo_collection("todo_items"))
-        updated_item = item_service.update_item(item_id, list_id, update_data)
+        item_service = TodoItemService(get_mongo_collection("todo_items"), lists=get_mongo_collection("todo_lists"))
+        updated_item = item_service.update_item(item_id, list_id, update_data, expected_version)
 
         return {
             "code": 200,
             "message": "Item updated",
-            "data": process_data(updated_item.model_dump())
-        }, 200
+            "data": updated_item.model_dump()
+        }, 200, {"ETag": version_etag(updated_item.version)}
 
     @jwt_required()
     @handle_exceptions
@@ -178,28 +473,25 @@ class TodoItemResource(Resource):
         Args:
             list_id:
             item_id:
+            If-Match: (header, optional) ETag of the version being deleted, 412 if it is stale
 
         Returns:
 
         """
         user_id = get_jwt_identity()
-        user_service = UserService(next(get_db()))
+        expected_version = get_if_match_version()
+        user_service = UserService(get_db())
         # check permission
         user_service.check_list_permission(user_id, list_id, PermType.EDIT)
         # query from mongo database
-        item_service = TodoItemService(get_mongo_collection("todo_items"))
+        item_service = TodoItemService(get_mongo_collection("todo_items"), get_mongo_collection("tombstones"),
+                                       get_mongo_collection("todo_lists"))
 
-        # check item whether is existed or not
-        try:
-            item_service.get_item(item_id, list_id)
-        except ResourceNotFoundError:
-            raise ResourceNotFoundError(f"Item {item_id} in list {list_id} not found")
+        # 执行删除操作（单次原子操作，由结果判断 404 / 412）
+        deleted = item_service.delete_item(item_id, list_id, expected_version)
 
-        # 执行删除操作
-        deleted = item_service.delete_item(item_id, list_id)
-        
         if not deleted:
-            raise ResourceNotFoundError(f"Item {item_id} in list {list_id} not found or already deleted")
+            raise ResourceNotFoundError(f"Item {item_id} in list {list_id} not found")
 
         return {
             "code": 200,
@@ -208,4 +500,7 @@ class TodoItemResource(Resource):
 
 
 api.add_resource(TodoItemCollection, "")
+api.add_resource(TodoItemBulk, "/bulk")
+api.add_resource(TodoItemExport, "/export")
+api.add_resource(TodoItemImport, "/import")
 api.add_resource(TodoItemResource, "/<string:item_id>")
@@ -1,25 +1,45 @@
 from flask_restful import Resource, Api
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy.orm import Session
 from pymongo.collection import Collection
 from app.dto.todo_dto import TodoListCreateDTO, TodoListUpdateDTO
 from app.models.todos import TodoList
-from app.models.users import PermType, Permission
+from app.models.users import PermType
 from app.services.todo_service import TodoListService
+from app.services.cascade_service import ListCascadeService, cascade_worker
 from app.services.user_service import UserService
 from app.extensions.db.db_postgres import get_db
 from app.extensions.db.db_mongo import get_mongo_collection
 from app.utils.error_handlers import handle_exceptions
-from app.utils.errors import ResourceNotFoundError
-from flask import request
-from app.utils.json_encoder import process_data
+from app.utils.errors import ResourceNotFoundError, ForbiddenError, ServiceUnavailableError
+from app.utils.etag import version_etag, not_modified, get_if_match_version
+from flask import request, current_app, Response
+from app.utils.json_encoder import output_json
+from app.utils.pagination import encode_cursor, decode_cursor, get_page_limit
+from app.utils.list_cache import ResponseKeys, get_cached_response, cache_response, cached_not_modified
+from app.utils.streaming import sse_chunks
+from app.extensions.db.db_redis import change_feed
 api = Api(prefix="/api/lists")
+api.representations["application/json"] = output_json
 
 
 def init_app(app):
     api.init_app(app)
 
 
+def check_list_permission_or_404(user_service: UserService, list_service: TodoListService,
+                                 user_id, list_id: str, required_perm: PermType):
+    """
+    check the (cached) permission first, and only look the list up in mongo
+    when it is denied, so a missing list still answers 404 instead of 403
+    """
+    try:
+        user_service.check_list_permission(user_id, list_id, required_perm)
+    except ForbiddenError:
+        if not list_service.list_exists(list_id):
+            raise ResourceNotFoundError(f"List {list_id} not found")
+        raise
+
+
 class TodoListCollection(Resource):
     @jwt_required()
     @handle_exceptions
@@ -34,7 +54,7 @@ class TodoListCollection(Resource):
         list_create = TodoListCreateDTO(**request.get_json())
 
         # 验证用户
-        user_service = UserService(next(get_db()))
+        user_service = UserService(get_db())
         user_service.get_user_by_id(user_id)
 
         # 创建列表
@@ -55,35 +75,49 @@ class TodoListCollection(Resource):
         return {
             "code": 200,
             "message": "List created",
-            "data": process_data(new_list.model_dump())
+            "data": new_list.model_dump()
         }, 201
 
     @jwt_required()
     @handle_exceptions
     def get(self):
         """
-        Get All Accessible Lists
-        {{base_url}}/api/lists
+        Get All Accessible Lists (keyset pagination)
+        {{base_url}}/api/lists?limit=50&cursor=
+        Args:
+            limit: page size
+            cursor: opaque cursor returned as `pagination.next_cursor` by the previous page
         Returns:
 
         """
         user_id = get_jwt_identity()
-        db: Session = next(get_db())
-
-        # 1, check permission
-        perms = db.query(Permission.list_id).filter(Permission.user_id == user_id).all()
-        list_ids = [p.list_id for p in perms]
+        limit = get_page_limit(request.args.get("limit"))
+        cursor = decode_cursor(request.args.get("cursor"), {"list_id": str})
+
+        # 1, check permission, fetch one more id to know whether there is a next page
+        user_service = UserService(get_db())
+        list_ids = user_service.list_permitted_list_ids(
+            user_id,
+            after=cursor["list_id"] if cursor else None,
+            limit=limit + 1
+        )
+        has_more = len(list_ids) > limit
+        list_ids = list_ids[:limit]
 
-        # 2, query list
+        # 2, query list in one round trip
         list_service = TodoListService(get_mongo_collection("todo_lists"))
-        lists = [list_service.get_list(list_id) for list_id in list_ids]
-        
+        lists = list_service.get_lists(list_ids)
+
         # 3, Transfer Pandantic object todict
         lists_data = [list_obj.model_dump() for list_obj in lists]
-        
+
         return {
             "code": 200,
-            "data": process_data(lists_data)
+            "data": lists_data,
+            "pagination": {
+                "limit": limit,
+                "next_cursor": encode_cursor({"list_id": list_ids[-1]}) if has_more else None
+            }
         }, 200
 
 
@@ -96,24 +130,38 @@ class TodoListResource(Resource):
         {{base_url}}/api/lists/{{list_id}}
         Args:
             list_id:
+            If-None-Match: (header, optional) ETag of the cached copy, 304 if it is still current
 
         Returns:
 
         """
         user_id = get_jwt_identity()
+        user_service = UserService(get_db())
+
+        # 0, 304 / serve from cache (only existing lists are cached)
+        keys = ResponseKeys(list_id)
+        response = cached_not_modified(keys)
+        if response:
+            user_service.check_list_permission(user_id, list_id, PermType.VIEW)
+            return response
+        body = get_cached_response(keys)
+        if body is not None:
+            user_service.check_list_permission(user_id, list_id, PermType.VIEW)
+            return body, 200, {"ETag": version_etag(body["data"].get("version", 0), body["data"].get("counts"))}
 
         # 1, check item is available
         list_service = TodoListService(get_mongo_collection("todo_lists"))
         todo_list = list_service.get_list(list_id)
 
         # 2, check permission
-        user_service = UserService(next(get_db()))
         user_service.check_list_permission(user_id, list_id, PermType.VIEW)
 
-        return {
+        etag = version_etag(todo_list.version, todo_list.counts)
+        body = cache_response(keys, {
             "code": 200,
-            "data": process_data(todo_list.model_dump())
-        }, 200
+            "data": todo_list.model_dump()
+        }, etag)
+        return not_modified(etag) or (body, 200, {"ETag": etag})
 
     @jwt_required()
     @handle_exceptions
@@ -123,27 +171,29 @@ class TodoListResource(Resource):
         {{base_url}}/api/lists/{{list_id}}
         Args:
             list_id:
+            If-Match: (header, optional) ETag of the version being edited, 412 if it is stale
 
         Returns:
 
         """
         user_id = get_jwt_identity()
-        user_service = UserService(next(get_db()))
-
+        expected_version = get_if_match_version()
+        user_service = UserService(get_db())
         list_service = TodoListService(get_mongo_collection("todo_lists"))
-        list_service.get_list(list_id)
 
-        # 2, Checking permission
-        user_service.check_list_permission(user_id, list_id, PermType.EDIT)
+        # 1, Checking permission
+        check_list_permission_or_404(user_service, list_service, user_id, list_id, PermType.EDIT)
 
-        # 3, Update List
-        updated_list = list_service.update_list(list_id, TodoListUpdateDTO(**request.get_json()).model_dump())
+        # 2, Update List (404 / 412 derived from the atomic update)
+        updated_list = list_service.update_list(list_id,
+                                                TodoListUpdateDTO(**request.get_json()).model_dump(),
+                                                expected_version)
 
         return {
             "code": 200,
             "message": "List updated",
-            "data": process_data(updated_list.model_dump())
-        }, 201
+            "data": updated_list.model_dump()
+        }, 201, {"ETag": version_etag(updated_list.version, updated_list.counts)}
 
     @jwt_required()
     @handle_exceptions
@@ -153,26 +203,31 @@ class TodoListResource(Resource):
         {{base_url}}/api/lists/{{list_id}}
         Args:
             list_id:
+            If-Match: (header, optional) ETag of the version being deleted, 412 if it is stale
 
         Returns:
 
         """
         user_id = get_jwt_identity()
-        user_service = UserService(next(get_db()))
-
-        # 1, check list is exist
-        list_service = TodoListService(get_mongo_collection("todo_lists"))
-        list_service.get_list(list_id)
+        expected_version = get_if_match_version()
+        user_service = UserService(get_db())
+        list_service = TodoListService(get_mongo_collection("todo_lists"), get_mongo_collection("tombstones"))
 
-        # 2, check permission
-        user_service.check_list_permission(user_id, list_id, PermType.EDIT)
+        # 1, check permission
+        check_list_permission_or_404(user_service, list_service, user_id, list_id, PermType.EDIT)
 
         # 删除MongoDB中的列表数据
-        deleted = list_service.delete_list(list_id)
+        deleted = list_service.delete_list(list_id, expected_version)
         
         if not deleted:
             raise ResourceNotFoundError(f"List {list_id} not found")
 
+        # 列表下的事项由后台 worker 分批删除
+        cascade_service = ListCascadeService(get_mongo_collection("list_deletions"),
+                                             get_mongo_collection("todo_items"))
+        cascade_service.enqueue(list_id)
+        cascade_worker.notify()
+
         # 删除PostgreSQL中的权限记录
         try:
             deleted_perms = user_service.revoke_list_permissions(list_id)
@@ -189,5 +244,41 @@ class TodoListResource(Resource):
             }, 200
 
 
+class TodoListEvents(Resource):
+    @jwt_required()
+    @handle_exceptions
+    def get(self, list_id: str):
+        """
+        Change Feed of a List (server-sent events)
+        {{base_url}}/api/lists/{{list_id}}/events
+        Args:
+            list_id:
+        Returns:
+            text/event-stream, events: list.updated / list.deleted / item.created / item.updated / item.deleted /
+            items.created / items.updated / items.deleted (bulk, counts only), resync and
+            permissions.revoked (the user lost access, the stream ends).
+            503 when this process already holds SSE_MAX_CONNECTIONS streams
+            events only say what changed, clients fetch the data with the delta sync (items?since=),
+            `resync` means events were dropped and a delta sync is required
+        """
+        user_id = get_jwt_identity()
+        user_service = UserService(get_db())
+        list_service = TodoListService(get_mongo_collection("todo_lists"))
+        check_list_permission_or_404(user_service, list_service, user_id, list_id, PermType.VIEW)
+
+        # 订阅后请求上下文即结束，长连接不占用数据库会话
+        subscriber = change_feed.subscribe(list_id, str(user_id))
+        if subscriber is None:
+            raise ServiceUnavailableError("Too many event streams on this server, retry later")
+        chunks = sse_chunks(change_feed, subscriber,
+                            heartbeat=current_app.config["SSE_HEARTBEAT"],
+                            max_duration=current_app.config["SSE_MAX_DURATION"])
+        return Response(chunks, status=200, mimetype="text/event-stream", headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        })
+
+
 api.add_resource(TodoListCollection, "")
 api.add_resource(TodoListResource, "/<string:list_id>")
+api.add_resource(TodoListEvents, "/<string:list_id>/events")
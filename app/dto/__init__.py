@@ -3,5 +3,6 @@ from .user_dto import (
 )
 from .todo_dto import (
     TodoListCreateDTO, TodoListUpdateDTO,
-    TodoItemCreateDTO, TodoItemUpdateDTO
+    TodoItemCreateDTO, TodoItemUpdateDTO,
+    TodoItemBulkFilterDTO, TodoItemBulkSelectDTO, TodoItemBulkUpdateDTO
 )
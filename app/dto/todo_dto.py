@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, List
 from datetime import datetime
+from app.models.todos import TodoStatus, TodoPriority
 
 
 class TodoListCreateDTO(BaseModel):
@@ -30,3 +31,33 @@ class TodoItemUpdateDTO(BaseModel):
     priority: Optional[str] = Field(None)
     tags: Optional[List[str]] = None
     media_url: Optional[str] = None
+
+
+class TodoItemBulkFilterDTO(BaseModel):
+    status: Optional[TodoStatus] = None
+    priority: Optional[TodoPriority] = None
+    due_date: Optional[datetime] = None  # due_date <= value
+
+
+class TodoItemBulkSelectDTO(BaseModel):
+    """select items either by id or by filter (exactly one of them)"""
+    item_ids: Optional[List[str]] = Field(None, min_length=1, max_length=1000)
+    filter: Optional[TodoItemBulkFilterDTO] = None
+
+    @model_validator(mode="after")
+    def one_selector(self):
+        if (self.item_ids is None) == (self.filter is None):
+            raise ValueError("Exactly one of item_ids or filter is required")
+        if self.filter is not None and not self.filter.model_dump(exclude_none=True):
+            raise ValueError("filter must contain at least one condition")
+        return self
+
+
+class TodoItemBulkChangeDTO(TodoItemUpdateDTO):
+    """fields set on every selected item, status / priority are validated as enums like the filter"""
+    status: Optional[TodoStatus] = None
+    priority: Optional[TodoPriority] = None
+
+
+class TodoItemBulkUpdateDTO(TodoItemBulkSelectDTO):
+    update: TodoItemBulkChangeDTO
@@ -1,4 +1,10 @@
-from .db.db_postgres import init_postgres, get_db
+from .db.db_postgres import init_postgres, get_db, get_pool_stats
 from .db.db_mongo import init_mongo, get_mongo_collection
-from .db.db_redis import init_redis
-from .jwt.jwt import init_jwt
\ No newline at end of file
+from .db.mongo_indexes import ensure_indexes, report_indexes
+from .db.db_redis import init_redis, cache, tiered_cache, change_feed
+from .jwt.jwt import init_jwt
+from .hashing.password_hasher import init_hashing, password_hasher
+from .rate_limit.rate_limiter import init_rate_limit, rate_limiter
+from .metrics.metrics import init_metrics, mark_process_dead
+from .metrics.tracing import init_tracing, span, traced
+from .metrics.profiler import init_profiler, request_profiler
@@ -0,0 +1,143 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# 订阅者队列溢出或 pub/sub 断线时发送的事件：客户端应通过增量同步（since）补齐数据
+RESYNC_EVENT = {"type": "resync"}
+# 列表权限被回收：只投递给 user_ids 中用户的连接，SSE 流收到后结束
+PERMISSIONS_REVOKED = "permissions.revoked"
+
+
+class Subscriber:
+    """一个 SSE 连接的事件队列，有长度上限，消费过慢时丢弃积压并要求客户端 resync"""
+
+    def __init__(self, list_id: str, max_queue: int, user_id: Optional[str] = None):
+        self.list_id = list_id
+        self.user_id = user_id
+        self.max_queue = max_queue
+        self._events = deque()
+        self._cond = threading.Condition()
+
+    def put(self, event: dict) -> None:
+        with self._cond:
+            if len(self._events) >= self.max_queue:
+                self._events.clear()
+                event = RESYNC_EVENT
+            self._events.append(event)
+            self._cond.notify()
+
+    def get(self, timeout: float) -> Optional[dict]:
+        """等待下一个事件，超时返回 None（用于发送心跳）"""
+        with self._cond:
+            if not self._events:
+                self._cond.wait(timeout)
+            return self._events.popleft() if self._events else None
+
+
+class ChangeFeed:
+    """
+    列表变更事件的发布 / 订阅。
+    写操作把事件发布到 Redis 的一个 channel；每个进程只有一个订阅连接（后台线程），
+    收到事件后按 list_id 分发给本进程内该列表的 Subscriber，所以空闲的 SSE 连接不占用 Redis 连接。
+    没有 Redis 时（init_app 未传 redis_client）只在本进程内分发
+    """
+
+    def __init__(self):
+        self._redis = None
+        self._channel = None
+        self._max_queue = 100
+        self._max_subscribers = None
+        self._subscribers: Dict[str, Set[Subscriber]] = {}
+        self._subscriber_count = 0
+        self._lock = threading.Lock()
+        self._listener_pid = None
+
+    def init_app(self, app, redis_client):
+        self._redis = redis_client
+        self._channel = app.config["CHANGE_FEED_CHANNEL"]
+        self._max_queue = app.config["SSE_MAX_QUEUE"]
+        self._max_subscribers = app.config["SSE_MAX_CONNECTIONS"]
+
+    # ------------------------------ publish ------------------------------
+    def publish(self, list_id: str, event_type: str, **fields) -> None:
+        event = {"type": event_type, "list_id": list_id, "ts": time.time(), **fields}
+        if self._redis is None:
+            self._dispatch(event)
+            return
+        try:
+            self._redis.publish(self._channel, json.dumps(event))
+        except Exception as e:
+            # 事件丢失时客户端仍可通过轮询 / 增量同步获取数据，不影响写操作本身
+            logger.warning("Failed to publish change event: %s", e)
+
+    # ------------------------------ subscribe ------------------------------
+    def subscribe(self, list_id: str, user_id: Optional[str] = None) -> Optional[Subscriber]:
+        """本进程的订阅数达到 SSE_MAX_CONNECTIONS 时返回 None"""
+        if self._redis is not None:
+            self._ensure_listener()
+        subscriber = Subscriber(list_id, self._max_queue, user_id)
+        with self._lock:
+            if self._max_subscribers is not None and self._subscriber_count >= self._max_subscribers:
+                return None
+            self._subscribers.setdefault(list_id, set()).add(subscriber)
+            self._subscriber_count += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.list_id)
+            if subscribers is not None and subscriber in subscribers:
+                subscribers.discard(subscriber)
+                self._subscriber_count -= 1
+                if not subscribers:
+                    del self._subscribers[subscriber.list_id]
+
+    def subscriber_count(self) -> int:
+        return self._subscriber_count
+
+    def _dispatch(self, event: dict) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(event["list_id"], ()))
+        if event["type"] == PERMISSIONS_REVOKED:
+            # 其他协作者不需要知道谁被移除
+            revoked = set(event.get("user_ids", ()))
+            subscribers = [s for s in subscribers if s.user_id in revoked]
+            event = {"type": PERMISSIONS_REVOKED, "list_id": event["list_id"], "ts": event["ts"]}
+        for subscriber in subscribers:
+            subscriber.put(event)
+
+    def _broadcast_resync(self) -> None:
+        with self._lock:
+            subscribers = [s for group in self._subscribers.values() for s in group]
+        for subscriber in subscribers:
+            subscriber.put(RESYNC_EVENT)
+
+    def _ensure_listener(self) -> None:
+        # 按 pid 判断，兼容 fork 出的 worker 进程（fork 后线程不会被继承）
+        if self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            thread = threading.Thread(target=self._listen, name="list-change-feed", daemon=True)
+            thread.start()
+            self._listener_pid = os.getpid()
+
+    def _listen(self) -> None:
+        """每个进程一个订阅连接；断线重连后通知所有订阅者 resync，因为期间的事件已经丢失"""
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._channel)
+                for message in pubsub.listen():
+                    self._dispatch(json.loads(message["data"]))
+            except Exception as e:
+                logger.warning("Change feed subscriber disconnected: %s", e)
+                self._broadcast_resync()
+                time.sleep(1)
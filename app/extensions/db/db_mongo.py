@@ -1,6 +1,7 @@
 from pymongo import MongoClient
 from flask import current_app
 import urllib.parse
+from app.extensions.db.mongo_indexes import ensure_indexes
 
 def init_mongo(app):
     # aware: username and password encode with URL
@@ -17,6 +18,11 @@ def init_mongo(app):
     app.mongo_client = client
     app.mongo_db = client.get_database()  # 获取数据库实例
 
+    # 启动时幂等地创建索引
+    if app.config["MONGO_ENSURE_INDEXES"]:
+        ensure_indexes(app.mongo_db, app.config)
+
+
 def get_mongo_collection(collection_name: str):
     """获取MongoDB集合（依赖注入）"""
     return current_app.mongo_db[collection_name]
\ No newline at end of file
@@ -1,26 +1,100 @@
+import threading
+import time
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from flask import current_app
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool
+from flask import current_app, g
+from app.extensions.metrics.metrics import record_pool_wait
 
 # 基础模型类
 Base = declarative_base()
 
 
+class InstrumentedQueuePool(QueuePool):
+    """记录获取连接的等待时间和超时次数，用于观察连接池是否耗尽"""
+
+    _stats_lock = threading.Lock()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            timed_out = True
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                self.wait_count += 1
+                self.wait_total += elapsed
+                self.wait_max = max(self.wait_max, elapsed)
+            record_pool_wait(elapsed, timed_out)
+
+
 def init_postgres(app):
     """初始化PostgreSQL连接"""
-    engine = create_engine(app.config["POSTGRES_URI"])
+    engine = create_engine(
+        app.config["POSTGRES_URI"],
+        poolclass=InstrumentedQueuePool,
+        pool_size=app.config["POSTGRES_POOL_SIZE"],
+        max_overflow=app.config["POSTGRES_MAX_OVERFLOW"],
+        pool_timeout=app.config["POSTGRES_POOL_TIMEOUT"],
+        pool_recycle=app.config["POSTGRES_POOL_RECYCLE"],
+        pool_pre_ping=app.config["POSTGRES_POOL_PRE_PING"]
+    )
+    app.postgres_engine = engine
     app.postgres_session = sessionmaker(autocommit=False,
                                         autoflush=False,
                                         bind=engine)
     if app.config["DEBUG"]:
         Base.metadata.create_all(bind=engine)
 
+    # 请求结束时归还连接
+    app.teardown_appcontext(close_db)
 
-def get_db():
-    """获取数据库会话（依赖注入）"""
-    db = current_app.postgres_session()
-    try:
-        yield db
-    finally:
+
+def get_db() -> Session:
+    """获取当前请求的数据库会话（请求内复用，请求结束时由 close_db 关闭）"""
+    if "db" not in g:
+        g.db = current_app.postgres_session()
+    return g.db
+
+
+def close_db(exc=None):
+    db = g.pop("db", None)
+    if db is not None:
+        if exc is not None:
+            db.rollback()
         db.close()
+
+
+def get_pool_stats() -> dict:
+    """连接池状态：已借出、溢出、空闲连接数以及获取连接的等待时间"""
+    pool = current_app.postgres_engine.pool
+    stats = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "max_overflow": current_app.config["POSTGRES_MAX_OVERFLOW"],
+    }
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update({
+            "wait_count": pool.wait_count,
+            "wait_avg_ms": round(pool.wait_total / pool.wait_count * 1000, 3) if pool.wait_count else 0.0,
+            "wait_max_ms": round(pool.wait_max * 1000, 3),
+            "timeouts": pool.timeouts,
+        })
+    return stats
@@ -1,6 +1,13 @@
+import redis
 from flask_caching import Cache
+from app.extensions.db.local_cache import TieredCache
+from app.extensions.db.change_feed import ChangeFeed
 
 cache = Cache()
+# L1(进程内) + L2(redis) 两级缓存，热点数据优先使用它
+tiered_cache = TieredCache(cache)
+# 列表变更事件（SSE），通过 redis pub/sub 在节点间广播
+change_feed = ChangeFeed()
 
 
 def init_redis(app):
@@ -14,3 +21,15 @@ def init_redis(app):
         "CACHE_KEY_PREFIX": app.config["CACHE_KEY_PREFIX"],
         "CACHE_DEFAULT_TIMEOUT": app.config["CACHE_DEFAULT_TIMEOUT"]
     })
+
+    # raw redis client, used for pub/sub
+    app.redis_client = None
+    if app.config["CACHE_TYPE"] in ("RedisCache", "redis"):
+        app.redis_client = redis.Redis(
+            host=app.config["REDIS_HOST"],
+            port=int(app.config["REDIS_PORT"] or 6379),
+            password=app.config["REDIS_PASSWORD"],
+            db=int(app.config["CACHE_REDIS_DB"] or 0)
+        )
+    tiered_cache.init_app(app, app.redis_client)
+    change_feed.init_app(app, app.redis_client)
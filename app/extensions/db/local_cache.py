@@ -0,0 +1,196 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+from app.extensions.metrics.metrics import record_cache
+from app.extensions.metrics.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# 缓存未命中标记（缓存的值本身可能是 None 以外的任意对象）
+_MISSING = object()
+
+
+# 失效计数按 key 的 hash 分片，内存固定；不同 key 落在同一分片时只会多跳过一次回填
+_EPOCH_STRIPES = 1024
+
+
+class LocalCache:
+    """进程内 LRU 缓存：容量上限 + TTL，线程安全"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # 每次 delete 递增 key 所在分片的计数，clear 递增 _generation，用于 set_if_unchanged
+        self._epochs = [0] * _EPOCH_STRIPES
+        self._generation = 0
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISSING
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            self._set(key, value)
+
+    def epoch(self, key: str) -> tuple:
+        """key 的失效版本，读 L2 之前取一次，回填时交给 set_if_unchanged"""
+        with self._lock:
+            return self._generation, self._epochs[hash(key) % _EPOCH_STRIPES]
+
+    def set_if_unchanged(self, key: str, value, epoch: tuple) -> bool:
+        """epoch 之后 key 被失效过（delete / clear）时不写入，避免把失效前读到的旧值放进 L1"""
+        with self._lock:
+            if (self._generation, self._epochs[hash(key) % _EPOCH_STRIPES]) != epoch:
+                return False
+            self._set(key, value)
+            return True
+
+    def _set(self, key: str, value) -> None:
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+                self._epochs[hash(key) % _EPOCH_STRIPES] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+
+
+class TieredCache:
+    """
+    两级缓存：L1 进程内 LocalCache + L2 Flask-Caching(Redis)。
+    写操作（set/add/delete）通过 Redis pub/sub 广播失效消息，其他节点收到后删除 L1 中的 key，
+    因此脏读时间不超过 pub/sub 传播延迟；L1 TTL 只作为消息丢失时的兜底。
+    未初始化 L1 时（init_app 未调用或被禁用）直接透传到 L2
+    """
+
+    def __init__(self, l2):
+        self.l2 = l2
+        self.l1: Optional[LocalCache] = None
+        self._redis = None
+        self._channel = None
+        self._node_id = uuid.uuid4().hex
+        self._listener_pid = None
+        self._listener_lock = threading.Lock()
+
+    def init_app(self, app, redis_client):
+        size = app.config["L1_CACHE_SIZE"]
+        if size <= 0 or redis_client is None:
+            return
+        self.l1 = LocalCache(size, app.config["L1_CACHE_TTL"])
+        self._redis = redis_client
+        self._channel = app.config["L1_CACHE_CHANNEL"]
+
+    # ------------------------------ read ------------------------------
+    def get(self, key: str):
+        if self.l1 is None:
+            with span("redis"):
+                value = self.l2.get(key)
+            record_cache("l2", value is not None)
+            return value
+        self._ensure_listener()
+        value = self.l1.get(key)
+        record_cache("l1", value is not _MISSING)
+        if value is not _MISSING:
+            return value
+        # 读 L2 期间到达的失效消息会改变 epoch，此时读到的可能是旧值，不回填 L1
+        epoch = self.l1.epoch(key)
+        with span("redis"):
+            value = self.l2.get(key)
+        record_cache("l2", value is not None)
+        if value is not None:
+            self.l1.set_if_unchanged(key, value, epoch)
+        return value
+
+    # ------------------------------ write ------------------------------
+    def set(self, key: str, value, timeout: Optional[int] = None):
+        with span("redis"):
+            result = self.l2.set(key, value, timeout=timeout)
+        self._invalidate(key)
+        if self.l1 is not None:
+            self.l1.set(key, value)
+        return result
+
+    def add(self, key: str, value, timeout: Optional[int] = None):
+        with span("redis"):
+            result = self.l2.add(key, value, timeout=timeout)
+        if result:
+            self._invalidate(key)
+        return result
+
+    def delete(self, key: str):
+        with span("redis"):
+            result = self.l2.delete(key)
+        self._invalidate(key)
+        return result
+
+    def delete_many(self, *keys: str):
+        with span("redis"):
+            result = self.l2.delete_many(*keys)
+        self._invalidate(*keys)
+        return result
+
+    # ------------------------------ pub/sub ------------------------------
+    def _invalidate(self, *keys: str) -> None:
+        if self.l1 is None or not keys:
+            return
+        self.l1.delete(*keys)
+        try:
+            self._redis.publish(self._channel, json.dumps({"node": self._sender_id(), "keys": list(keys)}))
+        except Exception as e:
+            # 广播失败时其他节点只能依赖 L1 TTL 过期
+            logger.warning("Failed to publish cache invalidation: %s", e)
+
+    def _sender_id(self) -> str:
+        # fork 出的 worker 共享 _node_id，需要加上 pid 区分
+        return f"{self._node_id}:{os.getpid()}"
+
+    def _ensure_listener(self) -> None:
+        # 按 pid 判断，兼容 gunicorn preload 之后 fork 出的 worker（fork 后线程不会被继承）
+        if self._listener_pid == os.getpid():
+            return
+        with self._listener_lock:
+            if self._listener_pid == os.getpid():
+                return
+            self.l1.clear()
+            thread = threading.Thread(target=self._listen, name="l1-cache-invalidation", daemon=True)
+            thread.start()
+            self._listener_pid = os.getpid()
+
+    def _listen(self) -> None:
+        """每个进程一个订阅连接；断线重连后清空 L1，因为期间的失效消息已经丢失"""
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._channel)
+                self.l1.clear()
+                for message in pubsub.listen():
+                    payload = json.loads(message["data"])
+                    if payload["node"] != self._sender_id():
+                        self.l1.delete(*payload["keys"])
+            except Exception as e:
+                logger.warning("Cache invalidation subscriber disconnected: %s", e)
+                self.l1.clear()
+                time.sleep(1)
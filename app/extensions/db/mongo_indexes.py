@@ -0,0 +1,103 @@
+from typing import Dict, List, Mapping, Tuple
+from pymongo import ASCENDING, IndexModel
+from pymongo.database import Database
+
+# 索引注册表：每个集合需要的索引，新增过滤/排序条件时在这里声明
+# item 的排序索引都以 item_id 结尾，与 list_items 的 keyset 分页保持一致
+MONGO_INDEXES: Dict[str, List[IndexModel]] = {
+    "todo_lists": [
+        IndexModel([("list_id", ASCENDING)], name="uniq_list_id", unique=True),
+    ],
+    "todo_items": [
+        IndexModel([("list_id", ASCENDING), ("item_id", ASCENDING)],
+                   name="uniq_list_id_item_id", unique=True),
+        IndexModel([("list_id", ASCENDING), ("due_date", ASCENDING), ("item_id", ASCENDING)],
+                   name="list_id_due_date_item_id"),
+        IndexModel([("list_id", ASCENDING), ("created_at", ASCENDING), ("item_id", ASCENDING)],
+                   name="list_id_created_at_item_id"),
+        IndexModel([("list_id", ASCENDING), ("title", ASCENDING), ("item_id", ASCENDING)],
+                   name="list_id_title_item_id"),
+        # priority/status 排序走数值 rank 字段
+        IndexModel([("list_id", ASCENDING), ("status_rank", ASCENDING), ("due_date", ASCENDING), ("item_id", ASCENDING)],
+                   name="list_id_status_rank_due_date_item_id"),
+        IndexModel([("list_id", ASCENDING), ("priority_rank", ASCENDING), ("due_date", ASCENDING), ("item_id", ASCENDING)],
+                   name="list_id_priority_rank_due_date_item_id"),
+        IndexModel([("list_id", ASCENDING), ("status", ASCENDING), ("due_date", ASCENDING), ("item_id", ASCENDING)],
+                   name="list_id_status_due_date_item_id"),
+        # 增量同步（since 游标）
+        IndexModel([("list_id", ASCENDING), ("updated_at", ASCENDING), ("item_id", ASCENDING)],
+                   name="list_id_updated_at_item_id"),
+    ],
+    # 删除记录，deleted_at 上的 TTL 索引见 MONGO_TTL_INDEXES
+    "tombstones": [
+        IndexModel([("list_id", ASCENDING), ("deleted_at", ASCENDING)], name="list_id_deleted_at"),
+    ],
+    # 级联删除任务队列
+    "list_deletions": [
+        IndexModel([("list_id", ASCENDING)], name="uniq_list_id", unique=True),
+        IndexModel([("requested_at", ASCENDING)], name="requested_at"),
+    ],
+    # 导入任务 checkpoint
+    "item_imports": [
+        IndexModel([("import_id", ASCENDING)], name="uniq_import_id", unique=True),
+    ],
+}
+
+
+# TTL 索引：collection -> [(index name, field, 过期秒数的配置项)]
+# 过期时间来自 app.config，修改配置后 ensure_indexes 用 collMod 更新已有索引（create_indexes 会因选项冲突报错）
+MONGO_TTL_INDEXES: Dict[str, List[Tuple[str, str, str]]] = {
+    "tombstones": [("deleted_at_ttl", "deleted_at", "TOMBSTONE_TTL")],
+}
+
+
+def _ensure_ttl_indexes(db: Database, coll_name: str, config: Mapping) -> List[str]:
+    coll = db[coll_name]
+    existing = coll.index_information()
+    names = []
+    for name, field, ttl_key in MONGO_TTL_INDEXES.get(coll_name, []):
+        ttl = int(config[ttl_key])
+        current = existing.get(name)
+        if current is None:
+            coll.create_index([(field, ASCENDING)], name=name, expireAfterSeconds=ttl)
+        elif current.get("expireAfterSeconds") != ttl:
+            db.command({"collMod": coll_name, "index": {"name": name, "expireAfterSeconds": ttl}})
+        names.append(name)
+    return names
+
+
+def ensure_indexes(db: Database, config: Mapping) -> Dict[str, List[str]]:
+    """
+    create every registered index, create_indexes is a no-op for indexes that already exist;
+    TTL indexes take their expiry from `config` and are updated in place when it changed
+    Returns: {collection: [index names]}
+    """
+    created = {}
+    for coll_name in MONGO_INDEXES.keys() | MONGO_TTL_INDEXES.keys():
+        names = db[coll_name].create_indexes(MONGO_INDEXES[coll_name]) if coll_name in MONGO_INDEXES else []
+        created[coll_name] = names + _ensure_ttl_indexes(db, coll_name, config)
+    return created
+
+
+def report_indexes(db: Database) -> Dict[str, Dict[str, List[str]]]:
+    """
+    compare registered indexes with the ones in the database
+    Returns: {collection: {"missing": [...], "unused": [...], "unregistered": [...]}}
+        missing: registered but not created
+        unused: existing indexes with zero accesses since the last server restart ($indexStats)
+        unregistered: existing indexes not declared in MONGO_INDEXES
+    """
+    report = {}
+    for coll_name, indexes in MONGO_INDEXES.items():
+        coll = db[coll_name]
+        expected = {index.document["name"] for index in indexes} \
+            | {name for name, _, _ in MONGO_TTL_INDEXES.get(coll_name, [])}
+        existing = set(coll.index_information().keys()) - {"_id_"}
+        usage = {stat["name"]: stat["accesses"]["ops"]
+                 for stat in coll.aggregate([{"$indexStats": {}}])}
+        report[coll_name] = {
+            "missing": sorted(expected - existing),
+            "unused": sorted(name for name in existing if usage.get(name, 0) == 0),
+            "unregistered": sorted(existing - expected),
+        }
+    return report
@@ -0,0 +1,128 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+import bcrypt
+from app.utils.errors import ServiceUnavailableError
+
+logger = logging.getLogger(__name__)
+
+
+def _hash_password(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+
+
+def _check_password(password: str, password_hash: str) -> bool:
+    try:
+        return bcrypt.checkpw(password.encode(), password_hash.encode())
+    except ValueError:
+        # 非 bcrypt 格式的 hash
+        return False
+
+
+class PasswordHasher:
+    """
+    bcrypt 哈希 / 校验放到有界进程池中执行，请求线程只等待结果，登录高峰不会占满 worker 线程的 CPU。
+    在途任务（排队 + 执行中）超过 max_pending 时直接返回 503，而不是无限排队拖慢所有请求。
+    pool_size 为 0 时在当前线程同步执行（开发 / 测试环境）。
+    进程池属于每个 WSGI worker 进程，总的哈希进程数 = worker 数 x pool_size
+    """
+
+    def __init__(self):
+        self.rounds = 12
+        self.pool_size = 0
+        self.max_pending = 0
+        self.timeout = 10.0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_pid = None
+        self._slots: Optional[threading.BoundedSemaphore] = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.configure(
+            rounds=app.config["BCRYPT_ROUNDS"],
+            pool_size=app.config["BCRYPT_POOL_SIZE"],
+            max_pending=app.config["BCRYPT_MAX_PENDING"],
+            timeout=app.config["BCRYPT_TIMEOUT"]
+        )
+
+    def configure(self, rounds: int, pool_size: int, max_pending: int, timeout: float) -> None:
+        self.shutdown()
+        self.rounds = rounds
+        self.pool_size = pool_size if pool_size >= 0 else (os.cpu_count() or 1)
+        self.max_pending = max_pending or self.pool_size * 4
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(self.max_pending) if self.pool_size else None
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self._pool_pid = None
+
+    # ------------------------------ api ------------------------------
+    def hash(self, password: str) -> str:
+        return self._run(_hash_password, password, self.rounds)
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        return self._run(_check_password, password, password_hash)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """hash 的 cost 与当前配置的 BCRYPT_ROUNDS 不一致（格式 $2b$<cost>$...）"""
+        try:
+            return int(password_hash.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    # ------------------------------ pool ------------------------------
+    def _run(self, func, *args):
+        if not self.pool_size:
+            return func(*args)
+        if not self._slots.acquire(blocking=False):
+            raise ServiceUnavailableError("Too many pending password checks, please retry later")
+        try:
+            future = self._get_pool().submit(func, *args)
+        except Exception:
+            self._slots.release()
+            self._reset_if_broken()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise ServiceUnavailableError("Password check timed out, please retry later")
+        except BrokenProcessPool:
+            # 子进程异常退出（如被 OOM kill），下一次调用重建进程池
+            self._reset_if_broken()
+            raise ServiceUnavailableError("Password hashing pool restarted, please retry")
+
+    def _reset_if_broken(self) -> None:
+        with self._lock:
+            if self._pool is not None and getattr(self._pool, "_broken", False):
+                logger.warning("Password hashing pool is broken, recreating it")
+                self._pool = None
+                self._pool_pid = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # 按 pid 懒创建，兼容 fork 模式的 worker 进程；forkserver 避免从多线程进程直接 fork
+        if self._pool_pid == os.getpid():
+            return self._pool
+        with self._lock:
+            if self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(max_workers=self.pool_size,
+                                                 mp_context=multiprocessing.get_context("forkserver"))
+                self._pool_pid = os.getpid()
+                logger.info("Password hashing pool started with %s workers", self.pool_size)
+            return self._pool
+
+
+password_hasher = PasswordHasher()
+
+
+def init_hashing(app):
+    password_hasher.init_app(app)
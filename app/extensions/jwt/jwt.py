@@ -1,4 +1,6 @@
 from flask_jwt_extended import JWTManager
+from flask_jwt_extended.default_callbacks import default_decode_key_callback
+from app.extensions.metrics.tracing import start_span, end_span
 
 
 def init_jwt(app):
@@ -28,3 +30,14 @@ def init_jwt(app):
             "code": 401,
             "message": "Authentication token is required"
         }, 401
+
+    # 解码前后的两个回调之间即 JWT 验签 + 解码的耗时（Server-Timing 中的 jwt）
+    @jwt.decode_key_loader
+    def decode_key_callback(jwt_header, jwt_payload):
+        start_span("jwt")
+        return default_decode_key_callback(jwt_header, jwt_payload)
+
+    @jwt.token_verification_loader
+    def token_verification_callback(jwt_header, jwt_data):
+        end_span("jwt")
+        return True
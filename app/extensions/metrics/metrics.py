@@ -0,0 +1,304 @@
+import hmac
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+from flask import Response, current_app, g, jsonify, request
+from flask_jwt_extended import verify_jwt_in_request, get_jwt
+from pymongo import monitoring
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+    from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, CONTENT_TYPE_LATEST
+except ImportError:  # prometheus_client is optional, metrics are disabled without it
+    prometheus_client = None
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+CALLS_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+
+
+class RequestStats:
+    """
+    当前请求内各层（mongo / postgres / redis / jwt ...）的耗时汇总，由监听器和 tracing.span 累加，
+    /metrics 和 Server-Timing 都从这里读取。events 不为 None 时（被采样的请求）同时保留每个 span 的明细
+    """
+    __slots__ = ("start", "spans", "events", "pending", "cache_hits", "cache_misses")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.spans = {}  # name -> [total seconds, count]
+        self.events = None  # sampled: [(name, start offset, seconds, detail)]
+        self.pending = {}  # spans started by a callback and finished by another one (see tracing.start_span)
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def add_span(self, name: str, start: float, seconds: float, detail: Optional[str] = None) -> None:
+        total = self.spans.get(name)
+        if total is None:
+            self.spans[name] = [seconds, 1]
+        else:
+            total[0] += seconds
+            total[1] += 1
+        if self.events is not None:
+            self.events.append((name, start - self.start, seconds, detail))
+
+    def span_count(self, name: str) -> int:
+        total = self.spans.get(name)
+        return total[1] if total else 0
+
+
+# 后台线程（级联删除、缓存失效订阅等）中没有 RequestStats，只记录全局计数
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+class _Metrics:
+    """
+    所有指标集中定义。设置了 PROMETHEUS_MULTIPROC_DIR 时 prometheus_client 以多进程模式运行，
+    每个 worker 写自己的 mmap 文件，/metrics 在抓取时合并所有进程的数据；gauge 使用 livesum，
+    worker 退出时需要调用 mark_process_dead(pid)（如 gunicorn 的 child_exit hook）
+    """
+
+    def __init__(self):
+        self.request_latency = Histogram(
+            "http_request_duration_seconds", "Request latency per resource and method",
+            ["endpoint", "method", "status"], buckets=LATENCY_BUCKETS)
+        self.request_mongo_calls = Histogram(
+            "http_request_mongo_commands", "Mongo commands per request",
+            ["endpoint", "method"], buckets=CALLS_BUCKETS)
+        self.request_postgres_calls = Histogram(
+            "http_request_postgres_queries", "Postgres queries per request",
+            ["endpoint", "method"], buckets=CALLS_BUCKETS)
+        self.mongo_commands = Counter(
+            "mongo_commands_total", "Mongo commands", ["command", "outcome"])
+        self.mongo_duration = Histogram(
+            "mongo_command_duration_seconds", "Mongo command latency", ["command"], buckets=LATENCY_BUCKETS)
+        self.postgres_queries = Counter(
+            "postgres_queries_total", "Postgres statements", ["statement"])
+        self.postgres_duration = Histogram(
+            "postgres_query_duration_seconds", "Postgres statement latency", ["statement"], buckets=LATENCY_BUCKETS)
+        self.cache_requests = Counter(
+            "cache_requests_total", "Cache lookups", ["tier", "result"])
+        self.postgres_pool_checked_out = Gauge(
+            "postgres_pool_checked_out", "Postgres connections checked out", multiprocess_mode="livesum")
+        self.postgres_pool_connections = Gauge(
+            "postgres_pool_connections", "Open postgres connections", multiprocess_mode="livesum")
+        self.postgres_pool_wait = Histogram(
+            "postgres_pool_wait_seconds", "Time spent waiting for a postgres connection", buckets=LATENCY_BUCKETS)
+        self.postgres_pool_timeouts = Counter(
+            "postgres_pool_timeouts_total", "Postgres pool checkout timeouts")
+        self.mongo_pool_checked_out = Gauge(
+            "mongo_pool_checked_out", "Mongo connections checked out", multiprocess_mode="livesum")
+        self.mongo_pool_connections = Gauge(
+            "mongo_pool_connections", "Open mongo connections", multiprocess_mode="livesum")
+
+
+_metrics: Optional[_Metrics] = None
+_listeners_registered = False
+
+
+# ------------------------------ recorders ------------------------------
+# 被各个扩展直接调用，未启用指标时为空操作
+
+def record_cache(tier: str, hit: bool) -> None:
+    stats = _request_stats.get()
+    if stats is not None:
+        if hit:
+            stats.cache_hits += 1
+        else:
+            stats.cache_misses += 1
+    if _metrics is not None:
+        _metrics.cache_requests.labels(tier, "hit" if hit else "miss").inc()
+
+
+def record_pool_wait(seconds: float, timed_out: bool = False) -> None:
+    if _metrics is None:
+        return
+    _metrics.postgres_pool_wait.observe(seconds)
+    if timed_out:
+        _metrics.postgres_pool_timeouts.inc()
+
+
+# ------------------------------ mongo ------------------------------
+class MongoCommandListener(monitoring.CommandListener):
+    """pymongo 命令监听器：在执行命令的线程上回调，因此可以归属到当前请求"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event, "success")
+
+    def failed(self, event):
+        self._record(event, "failure")
+
+    @staticmethod
+    def _record(event, outcome: str) -> None:
+        seconds = event.duration_micros / 1e6
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.add_span("mongo", time.perf_counter() - seconds, seconds, event.command_name)
+        if _metrics is not None:
+            _metrics.mongo_commands.labels(event.command_name, outcome).inc()
+            _metrics.mongo_duration.labels(event.command_name).observe(seconds)
+
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_check_out_started(self, event): pass
+    def connection_check_out_failed(self, event): pass
+    def connection_ready(self, event): pass
+
+    def connection_created(self, event):
+        _metrics.mongo_pool_connections.inc()
+
+    def connection_closed(self, event):
+        _metrics.mongo_pool_connections.dec()
+
+    def connection_checked_out(self, event):
+        _metrics.mongo_pool_checked_out.inc()
+
+    def connection_checked_in(self, event):
+        _metrics.mongo_pool_checked_out.dec()
+
+
+# ------------------------------ postgres ------------------------------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info["query_start"].pop()
+    seconds = time.perf_counter() - start
+    verb = statement.lstrip().split(" ", 1)[0].upper()
+    verb = verb if verb in ("SELECT", "INSERT", "UPDATE", "DELETE") else "OTHER"
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.add_span("pg", start, seconds, verb)
+    if _metrics is not None:
+        _metrics.postgres_queries.labels(verb).inc()
+        _metrics.postgres_duration.labels(verb).observe(seconds)
+
+
+def _pool_connect(dbapi_connection, connection_record):
+    _metrics.postgres_pool_connections.inc()
+
+
+def _pool_close(dbapi_connection, connection_record):
+    _metrics.postgres_pool_connections.dec()
+
+
+def _pool_checkout(dbapi_connection, connection_record, connection_proxy):
+    _metrics.postgres_pool_checked_out.inc()
+
+
+def _pool_checkin(dbapi_connection, connection_record):
+    _metrics.postgres_pool_checked_out.dec()
+
+
+# ------------------------------ flask ------------------------------
+def _start_request():
+    g.request_stats_token = _request_stats.set(RequestStats())
+
+
+def _finish_request(response):
+    stats = _request_stats.get()
+    if stats is not None and _metrics is not None and request.endpoint is not None:
+        endpoint, method = request.endpoint, request.method
+        _metrics.request_latency.labels(endpoint, method, str(response.status_code)) \
+            .observe(time.perf_counter() - stats.start)
+        _metrics.request_mongo_calls.labels(endpoint, method).observe(stats.span_count("mongo"))
+        _metrics.request_postgres_calls.labels(endpoint, method).observe(stats.span_count("pg"))
+    return response
+
+
+def _reset_request(exc=None):
+    token = g.pop("request_stats_token", None)
+    if token is not None:
+        _request_stats.reset(token)
+
+
+def _scrape_denied() -> Optional[Response]:
+    """
+    /metrics 暴露各接口流量、连接池和数据库命令分布，只允许 METRICS_TOKEN（Bearer，供 Prometheus 抓取）
+    或 ADMIN 角色的 JWT 访问
+    """
+    token = current_app.config["METRICS_TOKEN"]
+    if token and hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return None
+    # 本模块在 models 之前加载（db_postgres 依赖它），UserRole 只能在这里导入
+    from app.models.users import UserRole
+    try:
+        verify_jwt_in_request()
+    except Exception:
+        response = jsonify({"code": 401, "message": "Authentication token is required"})
+        response.status_code = 401
+        return response
+    if get_jwt().get("role") != UserRole.ADMIN.value:
+        response = jsonify({"code": 403, "message": "Admin permission required"})
+        response.status_code = 403
+        return response
+    return None
+
+
+def metrics_view():
+    denied = _scrape_denied()
+    if denied is not None:
+        return denied
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        # 每次抓取时合并所有 worker 进程的指标文件
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return Response(prometheus_client.generate_latest(registry), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+
+def mark_process_dead(pid: int) -> None:
+    """worker 退出时清理它的 livesum gauge（gunicorn: child_exit hook 中调用）"""
+    if prometheus_client is not None and os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
+
+
+def init_metrics(app):
+    """
+    注册监听器和 /metrics 路由，需要在 init_postgres / init_mongo 之前调用（pymongo 监听器只对之后创建的客户端生效）。
+    请求内统计（RequestStats）总是开启；prometheus 指标需要 METRICS_ENABLED 且安装了 prometheus_client
+    """
+    global _metrics, _listeners_registered
+    app.before_request(_start_request)
+    app.teardown_request(_reset_request)
+    # 监听器是进程级的，多次 create_app（测试）时只注册一次
+    if not _listeners_registered:
+        monitoring.register(MongoCommandListener())
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _listeners_registered = True
+
+    if not app.config["METRICS_ENABLED"]:
+        return
+    if prometheus_client is None:
+        logger.warning("prometheus_client is not installed, /metrics is disabled")
+        return
+    if _metrics is None:
+        _metrics = _Metrics()
+        monitoring.register(MongoPoolListener())
+        event.listen(Pool, "connect", _pool_connect)
+        event.listen(Pool, "close", _pool_close)
+        event.listen(Pool, "checkout", _pool_checkout)
+        event.listen(Pool, "checkin", _pool_checkin)
+    app.after_request(_finish_request)
+    app.add_url_rule(app.config["METRICS_PATH"], "metrics", metrics_view)
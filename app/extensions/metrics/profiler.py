@@ -0,0 +1,195 @@
+import cProfile
+import hashlib
+import hmac
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Optional
+from flask import g, request
+from flask_jwt_extended import verify_jwt_in_request, get_jwt
+from app.models.users import UserRole
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("sample", "cprofile")
+PROFILE_QUERY_ARG = "_profile"
+PROFILE_HEADER = "X-Profile"
+# 响应头：本次 profile 的文件名，用 /api/health/profiles/<profile_id> 下载
+PROFILE_ID_HEADER = "X-Profile-Id"
+PROFILE_SUFFIXES = (".folded", ".prof")
+
+
+def sign_profile_request(secret: str, mode: str, method: str, path: str) -> str:
+    """X-Profile 头的值："<mode>:<hmac>"，签名绑定 method + path，泄露的头不能用来 profile 其他接口"""
+    digest = hmac.new(secret.encode(), f"{mode}:{method} {path}".encode(), hashlib.sha256).hexdigest()
+    return f"{mode}:{digest}"
+
+
+class StackSampler:
+    """
+    采样 profiler：后台线程按 interval 读取请求线程的调用栈，结果为折叠栈格式
+    （"root;caller;callee count"），可直接交给 flamegraph.pl / speedscope 生成火焰图
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            # f_back 从当前执行的帧指向调用方，折叠栈需要从根开始
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class RequestProfiler:
+    """
+    按需 profile 单个请求，只对 ADMIN token 生效：
+      - query 参数 ?_profile=sample|cprofile
+      - 或签名请求头 X-Profile: <mode>:<hmac>（见 sign_profile_request，不改变 URL，响应缓存 key 不受影响）
+    sample 输出折叠栈（.folded，火焰图），cprofile 输出 pstats（.prof，snakeviz / flameprof）。
+    文件写入 PROFILER_DIR，文件名通过 X-Profile-Id 响应头返回；每次写入后按 PROFILER_MAX_FILES / PROFILER_MAX_AGE 清理旧文件。
+    没有触发条件的请求只多一次 query / header 的字典查找
+    """
+
+    def __init__(self):
+        self.directory = None
+        self.secret = None
+        self.interval = 0.001
+        self.max_files = 50
+        self.max_age = 7 * 24 * 3600
+
+    def init_app(self, app):
+        if not app.config["PROFILER_ENABLED"]:
+            return
+        self.directory = app.config["PROFILER_DIR"]
+        self.secret = app.config["PROFILER_SECRET"]
+        self.interval = app.config["PROFILER_INTERVAL"]
+        self.max_files = app.config["PROFILER_MAX_FILES"]
+        self.max_age = app.config["PROFILER_MAX_AGE"]
+        app.before_request(self.start)
+        app.after_request(self.finish)
+        app.teardown_request(self.abort)
+
+    # ------------------------------ trigger ------------------------------
+    def requested_mode(self) -> Optional[str]:
+        mode = request.args.get(PROFILE_QUERY_ARG)
+        if mode is not None:
+            return mode if mode in PROFILE_MODES else None
+        header = request.headers.get(PROFILE_HEADER)
+        if header is None or not self.secret:
+            return None
+        mode = header.split(":", 1)[0]
+        expected = sign_profile_request(self.secret, mode, request.method, request.path)
+        if mode in PROFILE_MODES and hmac.compare_digest(header, expected):
+            return mode
+        return None
+
+    @staticmethod
+    def is_admin() -> bool:
+        try:
+            verify_jwt_in_request()
+        except Exception:
+            return False
+        return get_jwt().get("role") == UserRole.ADMIN.value
+
+    # ------------------------------ hooks ------------------------------
+    def start(self):
+        if PROFILE_QUERY_ARG not in request.args and PROFILE_HEADER not in request.headers:
+            return None
+        mode = self.requested_mode()
+        if mode is None or not self.is_admin():
+            # 非管理员带上触发参数时按普通请求处理
+            return None
+        if mode == "sample":
+            profiler = StackSampler(threading.get_ident(), self.interval)
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        g.profiler = (mode, profiler)
+        return None
+
+    def finish(self, response):
+        state = g.pop("profiler", None)
+        if state is None:
+            return response
+        mode, profiler = state
+        self._stop(mode, profiler)
+        response.headers[PROFILE_ID_HEADER] = self._save(mode, profiler)
+        return response
+
+    def abort(self, exc=None):
+        # 请求异常时 after_request 不会执行，这里保证 profiler 被停止
+        state = g.pop("profiler", None)
+        if state is not None:
+            self._stop(*state)
+
+    @staticmethod
+    def _stop(mode: str, profiler) -> None:
+        if mode == "sample":
+            profiler.stop()
+        else:
+            profiler.disable()
+
+    def _save(self, mode: str, profiler) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        endpoint = (request.endpoint or "unknown").replace(".", "_")
+        profile_id = f"{time.strftime('%Y%m%d%H%M%S')}-{endpoint}-{uuid.uuid4().hex[:8]}"
+        if mode == "sample":
+            profile_id += ".folded"
+            with open(os.path.join(self.directory, profile_id), "w") as f:
+                f.write(profiler.folded())
+        else:
+            profile_id += ".prof"
+            profiler.dump_stats(os.path.join(self.directory, profile_id))
+        logger.info("Request %s %s profiled: %s", request.method, request.path, profile_id)
+        self._prune()
+        return profile_id
+
+    def _prune(self) -> None:
+        """保留最新的 max_files 个、且不超过 max_age 秒的 profile 文件"""
+        profiles = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(PROFILE_SUFFIXES):
+                profiles.append((entry.stat().st_mtime, entry.path))
+        profiles.sort(reverse=True)
+        expire_before = time.time() - self.max_age
+        for position, (mtime, path) in enumerate(profiles):
+            if position >= self.max_files or mtime < expire_before:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    # 其他 worker 同时在清理
+                    pass
+
+
+request_profiler = RequestProfiler()
+
+
+def init_profiler(app):
+    request_profiler.init_app(app)
@@ -0,0 +1,136 @@
+import functools
+import json
+import logging
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from flask import request
+from flask_jwt_extended import get_jwt
+from app.extensions.metrics.metrics import current_request_stats
+
+# 采样的 trace 以单行 JSON 输出到这个 logger，方便日志系统按字段检索
+trace_logger = logging.getLogger("app.trace")
+
+# Server-Timing 中 span 的固定顺序（按请求经过的层），其余 span 按名字排在后面。
+# span 可以嵌套：perm 包含权限检查中的 redis / pg，build 包含构建响应时的 mongo
+SPAN_ORDER = ("ratelimit", "jwt", "perm", "redis", "pg", "mongo", "build", "serialize")
+
+
+@contextmanager
+def span(name: str, detail: str = None):
+    """记录一段代码的耗时；不在请求内（后台线程 / CLI）时只有一次 ContextVar 读取的开销"""
+    stats = current_request_stats()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add_span(name, start, time.perf_counter() - start, detail)
+
+
+def traced(name: str):
+    """span 的装饰器形式"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def start_span(name: str) -> None:
+    """开始和结束在不同回调中的 span（如 JWT 的 decode_key_loader / token_verification_loader）"""
+    stats = current_request_stats()
+    if stats is not None:
+        stats.pending[name] = time.perf_counter()
+
+
+def end_span(name: str) -> None:
+    stats = current_request_stats()
+    if stats is not None:
+        start = stats.pending.pop(name, None)
+        if start is not None:
+            stats.add_span(name, start, time.perf_counter() - start)
+
+
+def _span_sort_key(name: str):
+    return (SPAN_ORDER.index(name), "") if name in SPAN_ORDER else (len(SPAN_ORDER), name)
+
+
+def server_timing(stats, total: float) -> str:
+    """Server-Timing: jwt;dur=0.31, mongo;dur=2.04;desc="2 calls", cache;desc="hit=1 miss=1", total;dur=4.80"""
+    parts = []
+    for name in sorted(stats.spans, key=_span_sort_key):
+        seconds, count = stats.spans[name]
+        entry = f"{name};dur={seconds * 1000:.2f}"
+        if count > 1:
+            entry += f';desc="{count} calls"'
+        parts.append(entry)
+    if stats.cache_hits or stats.cache_misses:
+        parts.append(f'cache;desc="hit={stats.cache_hits} miss={stats.cache_misses}"')
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+def _admin_request() -> bool:
+    """本次请求已验证的 JWT 是否为 ADMIN（未经过 jwt_required 的请求没有 JWT，返回 False）"""
+    # 本模块在 models 之前加载（local_cache 依赖它），UserRole 只能在这里导入
+    from app.models.users import UserRole
+    try:
+        return get_jwt().get("role") == UserRole.ADMIN.value
+    except RuntimeError:
+        return False
+
+
+def trace_record(stats, response, total: float) -> dict:
+    return {
+        "trace_id": uuid.uuid4().hex,
+        "method": request.method,
+        "path": request.path,
+        "endpoint": request.endpoint,
+        "status": response.status_code,
+        "duration_ms": round(total * 1000, 3),
+        "spans": {name: {"ms": round(seconds * 1000, 3), "count": count}
+                  for name, (seconds, count) in stats.spans.items()},
+        "cache": {"hit": stats.cache_hits, "miss": stats.cache_misses},
+        "events": [{"name": name, "start_ms": round(offset * 1000, 3), "ms": round(seconds * 1000, 3),
+                    "detail": detail}
+                   for name, offset, seconds, detail in stats.events],
+    }
+
+
+def init_tracing(app):
+    """
+    请求级 tracing：各层的 span 汇总成 Server-Timing 响应头（只发给 ADMIN token 的请求）；按 TRACE_SAMPLE_RATE 采样的请求
+    额外记录每个 span 的明细并输出 JSON trace 日志。需要在 init_metrics 之后调用（依赖它创建的 RequestStats）
+    """
+    server_timing_enabled = app.config["SERVER_TIMING_ENABLED"]
+    sample_rate = app.config["TRACE_SAMPLE_RATE"]
+    if not server_timing_enabled and sample_rate <= 0:
+        return
+
+    if sample_rate > 0:
+        @app.before_request
+        def sample_request():
+            stats = current_request_stats()
+            if stats is not None and random.random() < sample_rate:
+                stats.events = []
+
+    @app.after_request
+    def finish_trace(response):
+        stats = current_request_stats()
+        if stats is None:
+            return response
+        total = time.perf_counter() - stats.start
+        if server_timing_enabled and _admin_request():
+            response.headers["Server-Timing"] = server_timing(stats, total)
+        if stats.events is not None:
+            trace_logger.info(json.dumps(trace_record(stats, response, total)))
+        return response
@@ -1,2 +1,2 @@
 from .users import User, UserRole, Permission, PermType
-from .todos import TodoList, TodoItem, TodoStatus, TodoPriority
\ No newline at end of file
+from .todos import TodoList, TodoItem, TodoStatus, TodoPriority, TodoItemRow, TodoListRow
\ No newline at end of file
@@ -1,2 +1,3 @@
-from .list import TodoList
-from .item import TodoItem, TodoStatus, TodoPriority
\ No newline at end of file
+from .list import TodoList, empty_counts
+from .item import TodoItem, TodoStatus, TodoPriority
+from .rows import TodoItemRow, TodoListRow
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, validator, field_validator
+from pydantic import BaseModel, Field, validator, field_validator, computed_field
 from datetime import datetime
 from typing import Optional, List
 import enum
@@ -9,11 +9,30 @@ class TodoStatus(str, enum.Enum):
     IN_PROGRESS = "In Progress"
     COMPLETED = "Completed"
 
+    @property
+    def rank(self) -> int:
+        # 数值排序键：Not Started < In Progress < Completed
+        return _STATUS_RANKS[self]
+
+    @property
+    def counter_key(self) -> str:
+        # 列表 counts 中对应的字段名，例如 not_started
+        return self.name.lower()
+
 class TodoPriority(str, enum.Enum):
     LOW = "Low"
     MEDIUM = "Medium"
     HIGH = "High"
 
+    @property
+    def rank(self) -> int:
+        # 数值排序键：Low < Medium < High
+        return _PRIORITY_RANKS[self]
+
+
+_STATUS_RANKS = {TodoStatus.NOT_STARTED: 1, TodoStatus.IN_PROGRESS: 2, TodoStatus.COMPLETED: 3}
+_PRIORITY_RANKS = {TodoPriority.LOW: 1, TodoPriority.MEDIUM: 2, TodoPriority.HIGH: 3}
+
 class TodoItem(BaseModel):
     item_id: str = Field(
         default_factory=lambda: f"item_{uuid.uuid4().hex[:8]}",
@@ -27,9 +46,21 @@ class TodoItem(BaseModel):
     priority: TodoPriority = Field(default=TodoPriority.MEDIUM)
     tags: List[str] = Field(default_factory=list)
     media_url: Optional[str] = None
+    version: int = Field(default=1, description="乐观锁版本号，每次更新 +1")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+    # 冗余存储的排序字段，使 priority/status 排序可以走 (list_id, rank, due_date) 索引
+    @computed_field
+    @property
+    def status_rank(self) -> int:
+        return self.status.rank
+
+    @computed_field
+    @property
+    def priority_rank(self) -> int:
+        return self.priority.rank
+
     @field_validator("title")
     def title_not_empty(cls, v):
         if not v.strip():
@@ -1,7 +1,13 @@
 from pydantic import BaseModel, Field, validator
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 import uuid
+from .item import TodoStatus
+
+
+def empty_counts() -> Dict[str, int]:
+    """列表冗余计数的初始值：total、每个状态（not_started / in_progress / completed）、overdue"""
+    return {"total": 0, **{status.counter_key: 0 for status in TodoStatus}, "overdue": 0}
 
 class TodoList(BaseModel):
     list_id: str = Field(
@@ -11,6 +17,8 @@ class TodoList(BaseModel):
     owner_id: str = Field(..., description="所属用户ID")
     title: str = Field(..., max_length=100)
     description: Optional[str] = Field(None, max_length=500)
+    version: int = Field(default=1, description="乐观锁版本号，每次更新 +1")
+    counts: Dict[str, int] = Field(default_factory=empty_counts, description="事项计数，由事项写操作 $inc 维护")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
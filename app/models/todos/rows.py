@@ -0,0 +1,39 @@
+from .item import TodoItem, TodoStatus, TodoPriority
+from .list import TodoList
+
+
+class _Row:
+    """
+    轻量只读行对象：直接从我们自己集合中读出的（可信）文档构造，跳过 pydantic 校验。
+    写路径仍然使用 TodoItem / TodoList 做完整校验
+    """
+    __slots__ = ()
+    _fields: tuple = ()
+    # 旧文档缺失字段时的默认值（version 字段之前写入的文档视为版本 0）
+    _defaults = {"version": 0}
+
+    def __init__(self, doc: dict):
+        for field in self._fields:
+            setattr(self, field, doc.get(field, self._defaults.get(field)))
+
+    def model_dump(self) -> dict:
+        # 与对应 pydantic 模型的 model_dump() 字段保持一致
+        return {field: getattr(self, field) for field in self._fields}
+
+
+class TodoItemRow(_Row):
+    _fields = tuple(TodoItem.model_fields) + ("status_rank", "priority_rank")
+    __slots__ = _fields
+
+    def __init__(self, doc: dict):
+        super().__init__(doc)
+        # 兼容 rank 字段回填之前写入的文档
+        if self.status_rank is None and self.status is not None:
+            self.status_rank = TodoStatus(self.status).rank
+        if self.priority_rank is None and self.priority is not None:
+            self.priority_rank = TodoPriority(self.priority).rank
+
+
+class TodoListRow(_Row):
+    _fields = tuple(TodoList.model_fields)
+    __slots__ = _fields
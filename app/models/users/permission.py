@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Enum, ForeignKey, DateTime, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -19,4 +19,8 @@ class Permission(Base):
 
     user = relationship("User", back_populates="permissions")
 
-    __table_args__ = ({"unique_constraint": ["list_id", "user_id"]},)
\ No newline at end of file
+    __table_args__ = (
+        UniqueConstraint("list_id", "user_id"),
+        # 按用户分页列出可访问的列表（list_permitted_list_ids）：WHERE user_id = ? AND list_id > ? ORDER BY list_id
+        Index("ix_permissions_user_id_list_id", "user_id", "list_id"),
+    )
\ No newline at end of file
@@ -3,9 +3,7 @@ from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
 from app.extensions.db.db_postgres import Base
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.extensions.hashing.password_hasher import password_hasher
 
 
 class UserRole(str, enum.Enum):
@@ -30,10 +28,13 @@ class User(Base):
     )
 
     def set_password(self, password: str):
-        self.password_hash = pwd_context.hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def verify_password(self, password: str) -> bool:
-        return pwd_context.verify(password, self.password_hash)
+        return password_hasher.verify(password, self.password_hash)
+
+    def password_needs_rehash(self) -> bool:
+        return password_hasher.needs_rehash(self.password_hash)
 
     def to_dict(self):
         return {
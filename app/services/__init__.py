@@ -1,2 +1,4 @@
 from .user_service import UserService
-from .todo_service import TodoListService, TodoItemService
\ No newline at end of file
+from .todo_service import TodoListService, TodoItemService, TombstoneService, ListCounterService
+from .cascade_service import ListCascadeService, cascade_worker
+from .import_service import ItemImportService
@@ -0,0 +1,156 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+from pymongo.collection import Collection
+
+logger = logging.getLogger(__name__)
+
+
+class ListCascadeService:
+    """
+    列表删除后的级联清理：把待清理的 list_id 记录到 list_deletions 集合，
+    由后台 worker 分批删除 todo_items，避免大列表删除阻塞请求或造成写锁尖峰
+    """
+
+    def __init__(self, jobs: Collection, items: Collection, lists: Optional[Collection] = None,
+                 batch_size: int = 1000, batch_pause: float = 0.05, lease_seconds: int = 300):
+        self.jobs = jobs
+        self.items = items
+        self.lists = lists
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.lease_seconds = lease_seconds
+
+    def enqueue(self, list_id: str) -> None:
+        """记录待清理的列表（幂等）"""
+        self.jobs.update_one(
+            {"list_id": list_id},
+            {"$setOnInsert": {"list_id": list_id, "requested_at": datetime.utcnow(), "lease_until": None}},
+            upsert=True
+        )
+
+    def claim(self) -> Optional[str]:
+        """领取一个未被占用（或租约已过期）的任务，多节点下同一任务只会被一个 worker 处理"""
+        now = datetime.utcnow()
+        job = self.jobs.find_one_and_update(
+            {"$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}]},
+            {"$set": {"lease_until": now + timedelta(seconds=self.lease_seconds)}},
+            sort=[("requested_at", 1)]
+        )
+        return job["list_id"] if job else None
+
+    def purge_list_items(self, list_id: str) -> int:
+        """分批删除列表下的所有事项，每批之间短暂停顿给其他写操作让路"""
+        deleted = 0
+        while True:
+            ids = [doc["_id"] for doc in
+                   self.items.find({"list_id": list_id}, {"_id": 1}).limit(self.batch_size)]
+            if not ids:
+                break
+            deleted += self.items.delete_many({"_id": {"$in": ids}}).deleted_count
+            # 续约，防止大列表清理时间超过租约被其他 worker 重复领取
+            self.jobs.update_one(
+                {"list_id": list_id},
+                {"$set": {"lease_until": datetime.utcnow() + timedelta(seconds=self.lease_seconds)}}
+            )
+            if len(ids) < self.batch_size:
+                break
+            time.sleep(self.batch_pause)
+        self.jobs.delete_one({"list_id": list_id})
+        return deleted
+
+    def run_pending(self) -> int:
+        """处理所有待清理任务，返回删除的事项数"""
+        deleted = 0
+        while True:
+            list_id = self.claim()
+            if list_id is None:
+                return deleted
+            count = self.purge_list_items(list_id)
+            logger.info("Cascade deleted %s items of list %s", count, list_id)
+            deleted += count
+
+    def find_orphan_list_ids(self) -> List[str]:
+        """
+        todo_items 中引用了已不存在列表的 list_id。
+        distinct 的结果受 16MB 文档大小限制，这里用 $group 聚合游标流式读取（allowDiskUse），按批检查是否存在
+        """
+        orphan_ids = []
+        cursor = self.items.aggregate([{"$group": {"_id": "$list_id"}}],
+                                      allowDiskUse=True, batchSize=self.batch_size)
+        chunk = []
+        for doc in cursor:
+            chunk.append(doc["_id"])
+            if len(chunk) >= self.batch_size:
+                orphan_ids.extend(self._missing_list_ids(chunk))
+                chunk = []
+        if chunk:
+            orphan_ids.extend(self._missing_list_ids(chunk))
+        return orphan_ids
+
+    def _missing_list_ids(self, list_ids: List[str]) -> List[str]:
+        existing = set(self.lists.distinct("list_id", {"list_id": {"$in": list_ids}}))
+        return [list_id for list_id in list_ids if list_id not in existing]
+
+    def sweep_orphans(self) -> List[str]:
+        """一次性回收历史遗留的孤儿事项：把它们的 list_id 加入清理队列"""
+        orphan_ids = self.find_orphan_list_ids()
+        for list_id in orphan_ids:
+            self.enqueue(list_id)
+        return orphan_ids
+
+
+def build_cascade_service(app) -> ListCascadeService:
+    return ListCascadeService(
+        jobs=app.mongo_db["list_deletions"],
+        items=app.mongo_db["todo_items"],
+        lists=app.mongo_db["todo_lists"],
+        batch_size=app.config["CASCADE_BATCH_SIZE"],
+        batch_pause=app.config["CASCADE_BATCH_PAUSE"],
+        lease_seconds=app.config["CASCADE_LEASE_SECONDS"]
+    )
+
+
+class CascadeWorker:
+    """每个进程一个后台线程，收到通知或定时轮询时处理 list_deletions 中的任务"""
+
+    def __init__(self):
+        self.app = None
+        self._wakeup = threading.Event()
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        if app.config["CASCADE_WORKER_ENABLED"]:
+            # 按 pid 懒启动，兼容 fork 模式的 worker 进程
+            app.before_request(self.ensure_started)
+
+    def ensure_started(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            threading.Thread(target=self._run, name="list-cascade-worker", daemon=True).start()
+            self._pid = os.getpid()
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        service = build_cascade_service(self.app)
+        interval = self.app.config["CASCADE_POLL_INTERVAL"]
+        while True:
+            self._wakeup.wait(timeout=interval)
+            self._wakeup.clear()
+            try:
+                service.run_pending()
+            except Exception as e:
+                logger.warning("Cascade worker failed: %s", e)
+
+
+cascade_worker = CascadeWorker()
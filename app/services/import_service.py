@@ -0,0 +1,176 @@
+import csv
+import hashlib
+import json
+from datetime import datetime
+from typing import IO, Iterator, Tuple
+from pydantic import ValidationError
+from pymongo.collection import Collection
+from app.dto.todo_dto import TodoItemCreateDTO
+from app.services.todo_service import TodoItemService
+from app.utils.error_handlers import format_validation_error
+from app.utils.errors import BadRequestError
+
+# mongo duplicate key error: the row was already imported by a previous (interrupted) run
+DUPLICATE_KEY_ERROR = 11000
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+
+def iter_ndjson_rows(stream: IO[bytes]) -> Iterator[Tuple[int, object]]:
+    """逐行解码并解析 NDJSON，yield (行号, dict 或解析异常)，空行跳过；非 UTF-8 的行和非法 JSON 一样按行计错"""
+    for row_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield row_no, json.loads(line.decode("utf-8"))
+        except ValueError as e:
+            # UnicodeDecodeError 和 JSONDecodeError 都是 ValueError
+            yield row_no, e
+
+
+class _LineDecoder:
+    """逐行解码字节流给 csv 使用，无法解码的行用替换字符代替并记录下来，由 iter_csv_rows 计入对应的数据行"""
+
+    def __init__(self, stream: IO[bytes]):
+        self.stream = stream
+        self.error = None
+
+    def __iter__(self):
+        for line in self.stream:
+            try:
+                yield line.decode("utf-8")
+            except UnicodeDecodeError as e:
+                self.error = e
+                yield line.decode("utf-8", errors="replace")
+
+
+def iter_csv_rows(stream: IO[bytes]) -> Iterator[Tuple[int, object]]:
+    """
+    逐行解析 CSV（首行为表头），tags 列用 ; 分隔，yield (数据行号, dict 或解析异常)。
+    无法解码或格式错误的记录按行计错，不中断导入
+    """
+    lines = _LineDecoder(stream)
+    reader = csv.DictReader(iter(lines))
+    try:
+        # 表头有问题时所有数据行都无法对应到列，直接拒绝整个文件
+        reader.fieldnames
+    except csv.Error as e:
+        raise BadRequestError(f"Invalid CSV header: {e}")
+    if lines.error is not None:
+        raise BadRequestError("CSV header is not valid UTF-8")
+    row_no = 0
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            row = ValueError(f"Invalid CSV row: {e}")
+        row_no += 1
+        if lines.error is not None:
+            row, lines.error = lines.error, None
+        if isinstance(row, dict):
+            row = {k: v for k, v in row.items() if k and v not in (None, "")}
+            if "tags" in row:
+                row["tags"] = [tag.strip() for tag in row["tags"].split(";") if tag.strip()]
+        yield row_no, row
+
+
+def iter_rows(stream: IO[bytes], fmt: str) -> Iterator[Tuple[int, object]]:
+    if fmt == "ndjson":
+        return iter_ndjson_rows(stream)
+    if fmt == "csv":
+        return iter_csv_rows(stream)
+    raise BadRequestError(f"Unsupported import format {fmt}, expected one of {', '.join(IMPORT_FORMATS)}")
+
+
+class ItemImportService:
+    """
+    流式导入待办事项：按 chunk 校验并用无序 insert_many 写入，内存只保留一个 chunk。
+    每个 chunk 写完后在 item_imports 集合中记录 checkpoint，中断后用同一个 import_id 重新提交即可续传。
+    导入行的 item_id 由 (import_id, 行号) 确定性生成，续传时重复写入的行会被唯一索引拒绝并计为 skipped
+    """
+
+    def __init__(self, imports: Collection, item_service: TodoItemService,
+                 chunk_size: int = 1000, max_errors: int = 1000):
+        self.imports = imports
+        self.item_service = item_service
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+
+    @staticmethod
+    def row_item_id(import_id: str, row_no: int) -> str:
+        return "item_" + hashlib.sha1(f"{import_id}:{row_no}".encode()).hexdigest()[:16]
+
+    def get_checkpoint(self, import_id: str, list_id: str) -> int:
+        job = self.imports.find_one({"import_id": import_id})
+        if job and job["list_id"] != list_id:
+            raise BadRequestError(f"Import {import_id} belongs to another list")
+        return job["checkpoint"] if job else 0
+
+    def run(self, import_id: str, list_id: str, rows: Iterator[Tuple[int, object]]) -> dict:
+        checkpoint = self.get_checkpoint(import_id, list_id)
+        report = {"import_id": import_id, "resumed_from": checkpoint,
+                  "processed": 0, "inserted": 0, "skipped": 0, "failed": 0, "errors": []}
+        chunk = []
+        last_row = checkpoint
+        saved = {"inserted": 0, "failed": 0}  # counters already persisted to the checkpoint
+        for row_no, raw in rows:
+            if row_no <= checkpoint:
+                continue
+            last_row = row_no
+            report["processed"] += 1
+            try:
+                if isinstance(raw, Exception):
+                    raise raw
+                if not isinstance(raw, dict):
+                    raise ValueError("Row must be a JSON object")
+                item = TodoItemService.build_item(list_id, TodoItemCreateDTO(**raw),
+                                                  item_id=self.row_item_id(import_id, row_no))
+                chunk.append((row_no, item))
+            except (ValidationError, ValueError, TypeError) as e:
+                self._add_error(report, row_no, format_validation_error(e))
+            if len(chunk) >= self.chunk_size:
+                self._flush(report, saved, list_id, chunk, last_row)
+                chunk = []
+        self._flush(report, saved, list_id, chunk, last_row, finished=True)
+        return report
+
+    def _flush(self, report: dict, saved: dict, list_id: str, chunk: list, last_row: int,
+               finished: bool = False) -> None:
+        write_errors = self.item_service.create_items([item for _, item in chunk])
+        for position, (row_no, _) in enumerate(chunk):
+            err = write_errors.get(position)
+            if err is None:
+                report["inserted"] += 1
+            elif err.get("code") == DUPLICATE_KEY_ERROR:
+                report["skipped"] += 1
+            else:
+                self._add_error(report, row_no, err.get("errmsg", "write error"))
+        # checkpoint 只在 chunk 写入后推进，保证续传不会漏行
+        self.imports.update_one(
+            {"import_id": report["import_id"]},
+            {"$set": {"list_id": list_id, "checkpoint": last_row, "updated_at": datetime.utcnow(),
+                      "status": "completed" if finished else "running"},
+             "$inc": {"inserted": report["inserted"] - saved["inserted"],
+                      "failed": report["failed"] - saved["failed"]}},
+            upsert=True
+        )
+        saved["inserted"], saved["failed"] = report["inserted"], report["failed"]
+        report["checkpoint"] = last_row
+
+    def _add_error(self, report: dict, row_no: int, message: str) -> None:
+        report["failed"] += 1
+        # 错误明细有上限，保证超大文件的内存占用有界
+        if len(report["errors"]) < self.max_errors:
+            report["errors"].append({"row": row_no, "message": message})
+
+
+def build_import_service(app, item_collection: Collection) -> ItemImportService:
+    return ItemImportService(
+        imports=app.mongo_db["item_imports"],
+        item_service=TodoItemService(item_collection, lists=app.mongo_db["todo_lists"]),
+        chunk_size=app.config["IMPORT_CHUNK_SIZE"],
+        max_errors=app.config["IMPORT_MAX_ERRORS"]
+    )
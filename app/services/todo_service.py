@@ -1,55 +1,303 @@
+import enum
+from pymongo import ReturnDocument, UpdateOne
 from pymongo.collection import Collection
-from typing import List, Optional
-from datetime import datetime
-from app.models.todos import TodoList, TodoItem, TodoStatus, TodoPriority
-from app.utils.errors import ResourceNotFoundError
-from app.extensions.db.db_redis import cache
+from pymongo.errors import BulkWriteError
+from typing import Dict, Iterator, List, Optional, Tuple
+from datetime import datetime, timezone
+from app.models.todos import TodoList, TodoItem, TodoStatus, TodoPriority, TodoItemRow, TodoListRow, empty_counts
+from app.dto.todo_dto import TodoItemCreateDTO
+from app.utils.errors import ResourceNotFoundError, PreconditionFailedError
+from app.utils.list_cache import bump_list_generation
+from app.extensions.db.db_redis import change_feed
+
+
+def _version_filter(query: dict, expected_version: Optional[int]) -> dict:
+    """乐观锁：带上 If-Match 的版本号，文档缺少 version 字段时视为版本 0"""
+    if expected_version is None:
+        return query
+    return {**query, "version": expected_version or {"$in": [None, 0]}}
+
+
+def _as_stored(value):
+    """值写入 mongo 再读出后的样子：datetime 为毫秒精度的 naive UTC，枚举为其值"""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.replace(microsecond=value.microsecond // 1000 * 1000)
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def _past_due(due_date: Optional[datetime], now: datetime) -> bool:
+    if due_date is None:
+        return False
+    if due_date.tzinfo is not None:
+        # mongo 中存储的是 naive UTC
+        due_date = due_date.astimezone(timezone.utc).replace(tzinfo=None)
+    return due_date < now
+
+
+def _counter_inc(status, past_due: bool, n: int = 1) -> Dict[str, int]:
+    """一组（同状态、同逾期与否的）事项对列表 counts 的增量"""
+    status = TodoStatus(status)
+    inc = {"counts.total": n, f"counts.{status.counter_key}": n}
+    if past_due and status != TodoStatus.COMPLETED:
+        inc["counts.overdue"] = n
+    return inc
+
+
+class ListCounterService:
+    """
+    todo_lists 文档上冗余的事项计数 counts（total / 各状态 / overdue），
+    由事项的写操作用 $inc 维护，列表摘要不需要再按状态 count_documents。
+    单个事项的写操作用写前 / 写后的文档计算增量，是精确的；批量更新 / 删除先聚合再写，两步之间的并发写会造成偏差，
+    是最终一致的。overdue 只在写操作时更新，事项随时间到期、或计数产生偏差时，由 reconcile 定期重算修正。
+    引入 counts 之前创建的列表没有该字段，升级时需要运行一次 backfill（flask backfill-list-counters）；
+    在此之前 apply 不会修改这些列表，避免产生只有部分字段的 counts
+    """
+
+    def __init__(self, lists: Collection):
+        self.lists = lists
+
+    def apply(self, list_id: str, *incs: Dict[str, int]) -> None:
+        """合并多个增量，抵消为 0 的字段不写"""
+        merged = {}
+        for inc in incs:
+            for field, n in inc.items():
+                merged[field] = merged.get(field, 0) + n
+        merged = {field: n for field, n in merged.items() if n}
+        if merged:
+            self.lists.update_one({"list_id": list_id, "counts": {"$exists": True}}, {"$inc": merged})
+
+    @staticmethod
+    def breakdown(items: Collection, query: dict, now: datetime) -> List[Tuple[str, bool, int]]:
+        """命中 query 的事项按 (status, 是否已过 due_date) 分组计数"""
+        pipeline = [
+            {"$match": query},
+            {"$group": {
+                "_id": {"list_id": "$list_id", "status": "$status", "past_due": {"$and": [
+                    {"$ne": [{"$ifNull": ["$due_date", None]}, None]},
+                    {"$lt": ["$due_date", now]}
+                ]}},
+                "n": {"$sum": 1}
+            }}
+        ]
+        return [(group["_id"], group["n"]) for group in items.aggregate(pipeline)]
+
+    def backfill(self, items: Collection, batch_size: int = 1000) -> int:
+        """为没有 counts 字段的旧列表计算初始计数（升级时运行一次）。Returns: 回填的列表数"""
+        return self.reconcile(items, batch_size, query={"counts": {"$exists": False}})
+
+    def reconcile(self, items: Collection, batch_size: int = 1000, query: Optional[dict] = None) -> int:
+        """
+        按 list_id 分批用聚合重算列表（默认全部）的 counts，只改写有偏差的列表。
+        条件更新要求 counts 仍等于重算前读到的值，期间有 $inc 的列表留给下一次 reconcile，避免覆盖掉新的增量
+        Returns: 修正的列表数
+        """
+        repaired = 0
+        batch = []
+        cursor = self.lists.find(query or {}, {"_id": 0, "list_id": 1, "counts": 1}).sort("list_id", 1)
+        for doc in cursor.batch_size(batch_size):
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                repaired += self._reconcile_batch(items, batch)
+                batch = []
+        if batch:
+            repaired += self._reconcile_batch(items, batch)
+        return repaired
+
+    def _reconcile_batch(self, items: Collection, docs: List[dict]) -> int:
+        now = datetime.utcnow()
+        actual = {doc["list_id"]: empty_counts() for doc in docs}
+        for group, n in self.breakdown(items, {"list_id": {"$in": list(actual)}}, now):
+            counts = actual[group["list_id"]]
+            for field, value in _counter_inc(group["status"], group["past_due"], n).items():
+                counts[field[len("counts."):]] += value
+        ops = [UpdateOne({"list_id": doc["list_id"], "counts": doc.get("counts")},
+                         {"$set": {"counts": actual[doc["list_id"]]}})
+               for doc in docs if doc.get("counts") != actual[doc["list_id"]]]
+        if not ops:
+            return 0
+        return self.lists.bulk_write(ops, ordered=False).modified_count
+
+
+class TombstoneService:
+    """
+    删除记录（tombstone）：增量同步时告诉客户端哪些事项 / 列表已被删除。
+    item_id 为 None 表示整个列表被删除；deleted_at 上的 TTL 索引负责过期清理（TOMBSTONE_TTL）
+    """
 
-class TodoListService:
     def __init__(self, collection: Collection):
         self.collection = collection
 
+    def record_items(self, list_id: str, item_ids: List[str]) -> None:
+        if not item_ids:
+            return
+        now = datetime.utcnow()
+        self.collection.insert_many(
+            [{"list_id": list_id, "item_id": item_id, "deleted_at": now} for item_id in item_ids],
+            ordered=False
+        )
+
+    def record_list(self, list_id: str) -> None:
+        self.collection.insert_one({"list_id": list_id, "item_id": None, "deleted_at": datetime.utcnow()})
+
+    def list_deleted(self, list_id: str) -> bool:
+        return self.collection.count_documents({"list_id": list_id, "item_id": None}, limit=1) > 0
+
+    def deleted_item_ids(self, list_id: str, after: datetime, until: datetime) -> List[str]:
+        """ids of items deleted in (after, until], uses the (list_id, deleted_at) index"""
+        cursor = self.collection.find(
+            {"list_id": list_id, "deleted_at": {"$gt": after, "$lte": until}, "item_id": {"$ne": None}},
+            {"_id": 0, "item_id": 1}
+        ).sort("deleted_at", 1)
+        return list(dict.fromkeys(doc["item_id"] for doc in cursor))
+
+
+class TodoListService:
+    def __init__(self, collection: Collection, tombstones: Optional[Collection] = None):
+        self.collection = collection
+        # 传入 tombstones 集合时，删除操作会记录 tombstone 供增量同步使用
+        self.tombstones = TombstoneService(tombstones) if tombstones is not None else None
+
     def create_list(self, list_data: TodoList) -> TodoList:
         list_dict = list_data.model_dump()
         self.collection.insert_one(list_dict)
-        return TodoList(**list_dict)
+        return list_data
 
-    def get_list(self, list_id: str) -> TodoList:
+    def get_list(self, list_id: str) -> TodoListRow:
         doc = self.collection.find_one({"list_id": list_id})
         if not doc:
             raise ResourceNotFoundError(f"List {list_id} not found")
-        return TodoList(**doc)
+        return TodoListRow(doc)
+
+    def get_lists(self, list_ids: List[str]) -> List[TodoListRow]:
+        """
+        batch fetch lists with a single $in query, keep the order of `list_ids`.
+        missing lists are skipped instead of failing the whole request
+        """
+        if not list_ids:
+            return []
+        docs = {doc["list_id"]: doc for doc in self.collection.find({"list_id": {"$in": list_ids}})}
+        return [TodoListRow(docs[list_id]) for list_id in list_ids if list_id in docs]
+
+    def list_exists(self, list_id: str) -> bool:
+        return self.collection.count_documents({"list_id": list_id}, limit=1) > 0
 
-    def update_list(self, list_id: str, update_data: dict) -> TodoList:
+    def update_list(self, list_id: str, update_data: dict, expected_version: Optional[int] = None) -> TodoListRow:
+        """single atomic update, 404 / 412 are derived from the result"""
         update_data["updated_at"] = datetime.utcnow()
         result = self.collection.find_one_and_update(
-            {"list_id": list_id},
-            {"$set": update_data},
+            _version_filter({"list_id": list_id}, expected_version),
+            {"$set": update_data, "$inc": {"version": 1}},
             return_document=True
         )
         if not result:
-            raise ResourceNotFoundError(f"List {list_id} not found")
-        return TodoList(**result)
+            self._raise_write_miss(list_id, expected_version)
+        bump_list_generation(list_id)
+        change_feed.publish(list_id, "list.updated", version=result.get("version"))
+        return TodoListRow(result)
+
+    def delete_list(self, list_id: str, expected_version: Optional[int] = None) -> bool:
+        result = self.collection.find_one_and_delete(
+            _version_filter({"list_id": list_id}, expected_version),
+            projection={"_id": 1}
+        )
+        if not result:
+            if expected_version is not None:
+                self._raise_write_miss(list_id, expected_version)
+            return False
+        if self.tombstones:
+            self.tombstones.record_list(list_id)
+        bump_list_generation(list_id)
+        change_feed.publish(list_id, "list.deleted")
+        return True
 
-    def delete_list(self, list_id: str) -> bool:
-        result = self.collection.delete_one({"list_id": list_id})
-        return result.deleted_count == 1
+    def _raise_write_miss(self, list_id: str, expected_version: Optional[int]):
+        # 只有写失败时才多查一次，区分版本冲突和列表不存在
+        if expected_version is not None and self.list_exists(list_id):
+            raise PreconditionFailedError(f"List {list_id} has been modified")
+        raise ResourceNotFoundError(f"List {list_id} not found")
 
 
 class TodoItemService:
-    def __init__(self, collection: Collection):
+    def __init__(self, collection: Collection, tombstones: Optional[Collection] = None,
+                 lists: Optional[Collection] = None):
         self.collection = collection
+        # 传入 tombstones 集合时，删除操作会记录 tombstone 供增量同步使用
+        self.tombstones = TombstoneService(tombstones) if tombstones is not None else None
+        # 传入 todo_lists 集合时，写操作同步维护列表的 counts
+        self.counters = ListCounterService(lists) if lists is not None else None
 
     def create_item(self, item_data: TodoItem) -> TodoItem:
         item_dict = item_data.model_dump()
         self.collection.insert_one(item_dict)
-        return TodoItem(**item_dict)
+        if self.counters:
+            self.counters.apply(item_data.list_id,
+                                _counter_inc(item_data.status, _past_due(item_data.due_date, datetime.utcnow())))
+        bump_list_generation(item_data.list_id)
+        change_feed.publish(item_data.list_id, "item.created", item_id=item_data.item_id,
+                            version=item_data.version)
+        return item_data
+
+    @staticmethod
+    def build_item(list_id: str, item_create: TodoItemCreateDTO, item_id: Optional[str] = None) -> TodoItem:
+        """TodoItemCreateDTO -> TodoItem（完整校验）"""
+        extra = {"item_id": item_id} if item_id else {}
+        return TodoItem(
+            list_id=list_id,
+            title=item_create.title,
+            description=item_create.description,
+            due_date=item_create.due_date,
+            status=TodoStatus(item_create.status) if item_create.status else TodoStatus.NOT_STARTED,
+            priority=TodoPriority(item_create.priority) if item_create.priority else TodoPriority.MEDIUM,
+            tags=item_create.tags,
+            **extra
+        )
+
+    def create_items(self, items: List[TodoItem]) -> Dict[int, dict]:
+        """
+        unordered insert_many of validated items, one round trip per batch.
+        Returns: {position in `items`: mongo write error ({"code", "errmsg"})} for the documents that failed
+        """
+        if not items:
+            return {}
+        errors = {}
+        try:
+            self.collection.insert_many([item.model_dump() for item in items], ordered=False)
+        except BulkWriteError as e:
+            errors = {err["index"]: err for err in e.details.get("writeErrors", [])}
+        if self.counters:
+            now = datetime.utcnow()
+            incs = {}
+            for position, item in enumerate(items):
+                if position not in errors:
+                    incs.setdefault(item.list_id, []).append(_counter_inc(item.status, _past_due(item.due_date, now)))
+            for list_id, list_incs in incs.items():
+                self.counters.apply(list_id, *list_incs)
+        if len(errors) < len(items):
+            for list_id in {item.list_id for item in items}:
+                bump_list_generation(list_id)
+                # 批量写入只发一个汇总事件，客户端用增量同步拉取具体数据
+                change_feed.publish(list_id, "items.created", count=len(items) - len(errors))
+        return errors
 
-    def get_item(self, item_id: str, list_id: str) -> TodoItem:
+    def get_item(self, item_id: str, list_id: str) -> TodoItemRow:
         doc = self.collection.find_one({"item_id": item_id, "list_id": list_id})
         if not doc:
             raise ResourceNotFoundError(f"Item {item_id} in list {list_id} not found")
-        return TodoItem(**doc)
+        return TodoItemRow(doc)
+
+    # 允许排序的字段 -> 实际排序键，item_id 作为稳定排序的 tiebreaker
+    # priority/status 使用数值 rank 字段，与 (list_id, rank, due_date) 索引一致
+    SORT_KEYS = {
+        "due_date": ["due_date", "item_id"],
+        "status": ["status_rank", "due_date", "item_id"],
+        "title": ["title", "item_id"],
+        "priority": ["priority_rank", "due_date", "item_id"],
+        "created_at": ["created_at", "item_id"],
+    }
 
     def list_items(
             self,
@@ -57,8 +305,14 @@ class TodoItemService:
             status: Optional[TodoStatus] = None,
             due_date: Optional[datetime] = None,
             sort_by: str = "due_date",
-            order: str = "asc"
-    ) -> List[TodoItem]:
+            order: str = "asc",
+            limit: Optional[int] = None,
+            after: Optional[dict] = None
+    ) -> List[TodoItemRow]:
+        """
+        keyset pagination: `after` holds the sort key values of the last item
+        of the previous page (see `page_cursor`), so every page costs one index range scan
+        """
         query = {"list_id": list_id}
 
         # 过滤
@@ -69,24 +323,223 @@ class TodoItemService:
 
         # 排序
         sort_dir = 1 if order.lower() == "asc" else -1
-        valid_fields = ["due_date", "status", "title", "priority", "created_at"]
-        sort_field = sort_by if sort_by in valid_fields else "due_date"
+        sort_keys = self.SORT_KEYS[self.resolve_sort_field(sort_by)]
+
+        if after:
+            query["$or"] = self._keyset_filter(list(zip(sort_keys, after["values"])), sort_dir)
 
         # 查询
-        cursor = self.collection.find(query).sort(sort_field, sort_dir)
-        return [TodoItem(**item) for item in cursor]
+        cursor = self.collection.find(query).sort([(key, sort_dir) for key in sort_keys])
+        if limit:
+            cursor = cursor.limit(limit)
+        return [TodoItemRow(item) for item in cursor]
+
+    def iter_items(self, list_id: str, batch_size: int) -> Iterator[TodoItemRow]:
+        """
+        stream every item of a list straight from the cursor (created_at, item_id order),
+        at most `batch_size` documents are held in memory at a time
+        """
+        cursor = self.collection.find({"list_id": list_id}, {"_id": 0}) \
+            .sort([("created_at", 1), ("item_id", 1)]) \
+            .batch_size(batch_size)
+        for doc in cursor:
+            yield TodoItemRow(doc)
+
+    def list_changes(self, list_id: str, after: Optional[dict] = None,
+                     limit: Optional[int] = None) -> List[TodoItemRow]:
+        """
+        items created or changed after the `after` position ({"updated_at", "item_id"}),
+        ordered by (updated_at, item_id) so the (list_id, updated_at, item_id) index serves the delta sync
+        """
+        query = {"list_id": list_id}
+        if after:
+            query["$or"] = self._keyset_filter([("updated_at", after["updated_at"]),
+                                                ("item_id", after["item_id"])], 1)
+        cursor = self.collection.find(query).sort([("updated_at", 1), ("item_id", 1)])
+        if limit:
+            cursor = cursor.limit(limit)
+        return [TodoItemRow(item) for item in cursor]
+
+    @classmethod
+    def resolve_sort_field(cls, sort_by: str) -> str:
+        return sort_by if sort_by in cls.SORT_KEYS else "due_date"
+
+    @classmethod
+    def page_cursor(cls, item: TodoItemRow, sort_by: str) -> dict:
+        """build the keyset position of an item for the given sort field"""
+        return {"values": [getattr(item, key) for key in cls.SORT_KEYS[cls.resolve_sort_field(sort_by)]]}
 
-    def update_item(self, item_id: str, list_id: str, update_data: dict) -> TodoItem:
+    @staticmethod
+    def _keyset_filter(keys: List[tuple], sort_dir: int) -> List[dict]:
+        """
+        items strictly after the (field, value) position in lexicographic key order.
+        mongo sorts null before any value, and range operators never match null,
+        so the null bucket has to be handled explicitly
+        """
+        op = "$gt" if sort_dir == 1 else "$lt"
+        clauses = []
+        for i, (field, value) in enumerate(keys):
+            prefix = dict(keys[:i])
+            if value is None:
+                # asc: every non-null value comes after null; desc: nulls are the tail
+                if sort_dir == 1:
+                    clauses.append({**prefix, field: {"$ne": None}})
+                continue
+            clauses.append({**prefix, field: {op: value}})
+            if sort_dir == -1:
+                clauses.append({**prefix, field: None})
+        return clauses
+
+    @staticmethod
+    def backfill_sort_ranks(collection: Collection) -> int:
+        """set status_rank / priority_rank on documents written before the rank fields existed"""
+        modified = 0
+        for field, enum_cls in (("status", TodoStatus), ("priority", TodoPriority)):
+            for member in enum_cls:
+                result = collection.update_many(
+                    {field: member.value, f"{field}_rank": {"$ne": member.rank}},
+                    {"$set": {f"{field}_rank": member.rank}}
+                )
+                modified += result.modified_count
+        return modified
+
+    @staticmethod
+    def _prepare_update(update_data: dict) -> dict:
         update_data["updated_at"] = datetime.utcnow()
-        result = self.collection.find_one_and_update(
-            {"item_id": item_id, "list_id": list_id},
-            {"$set": update_data},
-            return_document=True
+        # 同步冗余的排序字段
+        if "status" in update_data:
+            update_data["status_rank"] = TodoStatus(update_data["status"]).rank
+        if "priority" in update_data:
+            update_data["priority_rank"] = TodoPriority(update_data["priority"]).rank
+        return update_data
+
+    def update_item(self, item_id: str, list_id: str, update_data: dict,
+                    expected_version: Optional[int] = None) -> TodoItemRow:
+        """single atomic update, 404 / 412 are derived from the result"""
+        self._prepare_update(update_data)
+        # 取回更新前的文档，更新后的状态在本地合成（按 mongo 存储后的形式），一次往返同时得到计数变化所需的新旧状态
+        before = self.collection.find_one_and_update(
+            _version_filter({"item_id": item_id, "list_id": list_id}, expected_version),
+            {"$set": update_data, "$inc": {"version": 1}},
+            return_document=ReturnDocument.BEFORE
+        )
+        if not before:
+            self._raise_write_miss(item_id, list_id, expected_version)
+        result = {**before, **{field: _as_stored(value) for field, value in update_data.items()},
+                  "version": (before.get("version") or 0) + 1}
+        if self.counters and ("status" in update_data or "due_date" in update_data):
+            now = datetime.utcnow()
+            self.counters.apply(list_id,
+                                _counter_inc(before["status"], _past_due(before.get("due_date"), now), -1),
+                                _counter_inc(result["status"], _past_due(result.get("due_date"), now)))
+        bump_list_generation(list_id)
+        change_feed.publish(list_id, "item.updated", item_id=item_id, version=result.get("version"))
+        return TodoItemRow(result)
+
+    def delete_item(self, item_id: str, list_id: str, expected_version: Optional[int] = None) -> bool:
+        result = self.collection.find_one_and_delete(
+            _version_filter({"item_id": item_id, "list_id": list_id}, expected_version),
+            projection={"_id": 1, "status": 1, "due_date": 1}
         )
         if not result:
-            raise ResourceNotFoundError(f"Item {item_id} in list {list_id} not found")
-        return TodoItem(**result)
+            if expected_version is not None:
+                self._raise_write_miss(item_id, list_id, expected_version)
+            return False
+        if self.counters:
+            self.counters.apply(list_id,
+                                _counter_inc(result["status"], _past_due(result.get("due_date"), datetime.utcnow()), -1))
+        if self.tombstones:
+            self.tombstones.record_items(list_id, [item_id])
+        bump_list_generation(list_id)
+        change_feed.publish(list_id, "item.deleted", item_id=item_id)
+        return True
+
+    def _raise_write_miss(self, item_id: str, list_id: str, expected_version: Optional[int]):
+        # 只有写失败时才多查一次，区分版本冲突和事项不存在
+        if expected_version is not None and \
+                self.collection.count_documents({"item_id": item_id, "list_id": list_id}, limit=1):
+            raise PreconditionFailedError(f"Item {item_id} in list {list_id} has been modified")
+        raise ResourceNotFoundError(f"Item {item_id} in list {list_id} not found")
+
+    @staticmethod
+    def _bulk_query(list_id: str, item_ids: Optional[List[str]] = None, filters: Optional[dict] = None) -> dict:
+        """items of a list selected by ids or by filter (status / priority / due_date <=)"""
+        query = {"list_id": list_id}
+        if item_ids is not None:
+            query["item_id"] = {"$in": item_ids}
+        for field, value in (filters or {}).items():
+            if field == "due_date":
+                query["due_date"] = {"$lte": value}
+            else:
+                query[field] = value.value if isinstance(value, (TodoStatus, TodoPriority)) else value
+        return query
+
+    def update_items(self, list_id: str, update_data: dict, item_ids: Optional[List[str]] = None,
+                     filters: Optional[dict] = None) -> Tuple[int, int]:
+        """
+        one update_many for every selected item.
+        list counts are eventually consistent on this path: the status / due_date breakdown is read before
+        update_many, a concurrent write to the same items in between makes the counters drift until the next
+        `reconcile-list-counters` run (single-item writes stay exact)
+        Returns: (matched count, modified count)
+        """
+        query = self._bulk_query(list_id, item_ids, filters)
+        self._prepare_update(update_data)
+        groups = None
+        if self.counters and ("status" in update_data or "due_date" in update_data):
+            now = datetime.utcnow()
+            groups = ListCounterService.breakdown(self.collection, query, now)
+        result = self.collection.update_many(query, {"$set": update_data, "$inc": {"version": 1}})
+        if groups:
+            # 所有命中的事项被设置为相同的 status / due_date，按分组换算计数变化
+            new_past_due = _past_due(update_data["due_date"], now) if "due_date" in update_data else None
+            incs = []
+            for group, n in groups:
+                incs.append(_counter_inc(group["status"], group["past_due"], -n))
+                incs.append(_counter_inc(update_data.get("status", group["status"]),
+                                         group["past_due"] if new_past_due is None else new_past_due, n))
+            self.counters.apply(list_id, *incs)
+        if result.modified_count:
+            bump_list_generation(list_id)
+            change_feed.publish(list_id, "items.updated", count=result.modified_count)
+        return result.matched_count, result.modified_count
+
+    def delete_items(self, list_id: str, item_ids: Optional[List[str]] = None,
+                     filters: Optional[dict] = None, batch_size: int = 1000) -> int:
+        """
+        one delete_many for every selected item, returns the deleted count.
+        with tombstones the ids are needed, so the selection is paged by item_id and deleted `batch_size` at a time.
+        like update_items, list counts are eventually consistent here (breakdown read before the delete,
+        drift from concurrent writes is repaired by `reconcile-list-counters`)
+        """
+        query = self._bulk_query(list_id, item_ids, filters)
+        if self.tombstones:
+            deleted = sum(self._delete_batch(list_id, {"list_id": list_id, "item_id": {"$in": ids}}, ids)
+                          for ids in self._item_id_batches(query, batch_size))
+        else:
+            deleted = self._delete_batch(list_id, query)
+        if deleted:
+            bump_list_generation(list_id)
+            change_feed.publish(list_id, "items.deleted", count=deleted)
+        return deleted
+
+    def _item_id_batches(self, query: dict, batch_size: int) -> Iterator[List[str]]:
+        """keyset pages of the matching item ids over the (list_id, item_id) index, at most one page in memory"""
+        last = None
+        while True:
+            page_query = query if last is None else {"$and": [query, {"item_id": {"$gt": last}}]}
+            ids = [doc["item_id"] for doc in
+                   self.collection.find(page_query, {"_id": 0, "item_id": 1}).sort("item_id", 1).limit(batch_size)]
+            if not ids:
+                return
+            yield ids
+            last = ids[-1]
 
-    def delete_item(self, item_id: str, list_id: str) -> bool:
-        result = self.collection.delete_one({"item_id": item_id, "list_id": list_id})
-        return result.deleted_count == 1
\ No newline at end of file
+    def _delete_batch(self, list_id: str, query: dict, item_ids: Optional[List[str]] = None) -> int:
+        groups = ListCounterService.breakdown(self.collection, query, datetime.utcnow()) if self.counters else None
+        result = self.collection.delete_many(query)
+        if groups:
+            self.counters.apply(list_id, *[_counter_inc(group["status"], group["past_due"], -n) for group, n in groups])
+        if item_ids:
+            self.tombstones.record_items(list_id, item_ids)
+        return result.deleted_count
@@ -1,4 +1,9 @@
+from typing import List, Optional
+from flask import current_app
 from sqlalchemy.orm import Session
+from app.extensions.db.change_feed import PERMISSIONS_REVOKED
+from app.extensions.db.db_redis import tiered_cache as cache, change_feed
+from app.extensions.metrics.tracing import traced
 from app.models.users import User, UserRole, Permission, PermType
 from app.dto.user_dto import UserCreateDTO, UserLoginDTO
 from app.utils.errors import (
@@ -8,6 +13,14 @@ from app.utils.errors import (
     ForbiddenError
 )
 
+# 负缓存标记：用户对该列表没有任何权限
+_NO_PERMISSION = "NONE"
+
+
+def _perm_cache_key(user_id, list_id: str) -> str:
+    # JWT identity may be int or str, normalize it to keep one key per user
+    return f"perm:{user_id}:{list_id}"
+
 
 class UserService:
     def __init__(self, db: Session):
@@ -34,6 +47,10 @@ class UserService:
         user = self.db.query(User).filter(User.email == user_login.email).first()
         if not user or not user.verify_password(user_login.password):
             raise AuthenticationError("Invalid email or password")
+        # 旧 cost 的 hash 在登录成功时透明升级（只有这时能拿到明文密码）
+        if user.password_needs_rehash():
+            user.set_password(user_login.password)
+            self.db.commit()
         return user
 
     def get_user_by_id(self, user_id: int) -> User:
@@ -42,19 +59,37 @@ class UserService:
             raise ResourceNotFoundError(f"User {user_id} not found")
         return user
 
-    def check_list_permission(self, user_id: int, list_id: str, required_perm: PermType):
+    def _get_perm_type(self, user_id: int, list_id: str) -> Optional[PermType]:
+        """
+        read permission type from cache first, fall back to postgres on miss.
+        negative results are cached as well, so unknown lists do not hit the db repeatedly
+        """
+        key = _perm_cache_key(user_id, list_id)
+        cached = cache.get(key)
+        if cached is not None:
+            return None if cached == _NO_PERMISSION else PermType(cached)
+
         perm = self.db.query(Permission).filter(
             Permission.user_id == user_id,
             Permission.list_id == list_id
         ).first()
+        perm_type = perm.perm_type if perm else None
+        cache.set(key,
+                  perm_type.value if perm_type else _NO_PERMISSION,
+                  timeout=current_app.config["PERMISSION_CACHE_TIMEOUT"])
+        return perm_type
+
+    @traced("perm")
+    def check_list_permission(self, user_id: int, list_id: str, required_perm: PermType):
+        perm_type = self._get_perm_type(user_id, list_id)
 
-        if not perm:
+        if not perm_type:
             raise ForbiddenError(f"User {user_id} has no permission for list {list_id}")
 
         # EDIT 权限包含 VIEW 权限
-        if required_perm == PermType.VIEW and perm.perm_type == PermType.EDIT:
+        if required_perm == PermType.VIEW and perm_type == PermType.EDIT:
             return
-        elif perm.perm_type != required_perm:
+        elif perm_type != required_perm:
             raise ForbiddenError(f"User {user_id} has no {required_perm} permission for list {list_id}")
 
     def grant_list_permission(self, user_id: int, list_id: str, perm_type: PermType) -> Permission:
@@ -69,6 +104,7 @@ class UserService:
         if existing:
             existing.perm_type = perm_type
             self.db.commit()
+            cache.delete(_perm_cache_key(user_id, list_id))
             return existing
 
         # create permission for user
@@ -80,14 +116,38 @@ class UserService:
         self.db.add(perm)
         self.db.commit()
         self.db.refresh(perm)
+        # drop cached (possibly negative) result, so the new grant takes effect immediately
+        cache.delete(_perm_cache_key(user_id, list_id))
         return perm
 
+    def list_permitted_list_ids(self, user_id: int, after: Optional[str] = None,
+                                limit: Optional[int] = None) -> List[str]:
+        """
+        keyset page of list ids the user can access, ordered by list_id.
+        `after` is the last list_id of the previous page, each page is a range scan
+        of the (user_id, list_id) index ix_permissions_user_id_list_id
+        """
+        query = self.db.query(Permission.list_id).filter(Permission.user_id == user_id)
+        if after:
+            query = query.filter(Permission.list_id > after)
+        query = query.order_by(Permission.list_id)
+        if limit:
+            query = query.limit(limit)
+        return [row.list_id for row in query.all()]
+
     def revoke_list_permissions(self, list_id: str) -> int:
         """
-        delete all permissions for a list
+        delete all permissions for a list,
+        open change feed (SSE) connections of the affected users are closed via a permissions.revoked event
         """
+        user_ids = [row.user_id for row in self.db.query(Permission.user_id).filter(
+            Permission.list_id == list_id
+        ).all()]
         deleted_count = self.db.query(Permission).filter(
             Permission.list_id == list_id
         ).delete()
         self.db.commit()
+        if user_ids:
+            cache.delete_many(*[_perm_cache_key(uid, list_id) for uid in user_ids])
+            change_feed.publish(list_id, PERMISSIONS_REVOKED, user_ids=[str(uid) for uid in user_ids])
         return deleted_count
@@ -3,10 +3,21 @@ from app.utils.errors import (
     ResourceNotFoundError,
     DuplicateResourceError,
     AuthenticationError,
-    ForbiddenError
+    ForbiddenError,
+    BadRequestError,
+    PreconditionFailedError,
+    GoneError,
+    ServiceUnavailableError
 )
 
 
+def format_validation_error(e: Exception) -> str:
+    """把 pydantic 校验错误格式化为一行可读信息（用于批量接口的逐条错误）"""
+    if isinstance(e, ValidationError):
+        return "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+    return str(e)
+
+
 def handle_exceptions(func):
     """统一异常处理装饰器"""
 
@@ -18,6 +29,26 @@ def handle_exceptions(func):
                 "code": 400,
                 "message": "Invalid request data",
             }, 400
+        except BadRequestError as e:
+            return {
+                "code": 400,
+                "message": str(e)
+            }, 400
+        except PreconditionFailedError as e:
+            return {
+                "code": 412,
+                "message": str(e)
+            }, 412
+        except GoneError as e:
+            return {
+                "code": 410,
+                "message": str(e)
+            }, 410
+        except ServiceUnavailableError as e:
+            return {
+                "code": 503,
+                "message": str(e)
+            }, 503, {"Retry-After": "1"}
         except ResourceNotFoundError as e:
             return {
                 "code": 404,
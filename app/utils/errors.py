@@ -8,6 +8,26 @@ class BusinessError(Exception):
             self.message = message
         super().__init__(self.message)
 
+class BadRequestError(BusinessError):
+    """请求参数非法异常（如分页游标无法解析）"""
+    code = 400
+    message = "BadRequestError"
+
+class PreconditionFailedError(BusinessError):
+    """If-Match 版本不一致（资源已被其他人修改）"""
+    code = 412
+    message = "Resource has been modified"
+
+class GoneError(BusinessError):
+    """资源已被删除，或增量同步游标已超过 tombstone 保留期，需要全量同步"""
+    code = 410
+    message = "Resource is gone"
+
+class ServiceUnavailableError(BusinessError):
+    """服务过载（如密码哈希进程池积压），客户端应稍后重试"""
+    code = 503
+    message = "Service temporarily unavailable"
+
 class DuplicateResourceError(BusinessError):
     """资源重复异常"""
     code = 401
@@ -0,0 +1,48 @@
+import zlib
+from typing import Dict, Optional
+from flask import request, Response
+from werkzeug.http import unquote_etag
+from app.utils.errors import BadRequestError
+
+
+def version_etag(version: int, counts: Optional[Dict[str, int]] = None) -> str:
+    """
+    资源的 ETag："版本号" 或 "版本号.计数校验和"（列表的 counts 随事项写入变化但不改变版本号）。
+    If-Match 只比较版本号部分，事项的增删不会让列表编辑产生版本冲突
+    """
+    if counts is None:
+        return f'"{version}"'
+    checksum = zlib.crc32(repr(sorted(counts.items())).encode())
+    return f'"{version}.{checksum:x}"'
+
+
+def generation_etag(generation) -> str:
+    """集合类响应的 ETag：列表的缓存代数，列表或其事项的任何写操作都会改变它"""
+    return f'"g{generation}"'
+
+
+def not_modified(etag: Optional[str]) -> Optional[Response]:
+    """If-None-Match 命中时返回 304 响应（弱比较），否则返回 None"""
+    if not etag or not request.if_none_match:
+        return None
+    if request.if_none_match.contains_weak(unquote_etag(etag)[0]):
+        return Response(status=304, headers={"ETag": etag})
+    return None
+
+
+def get_if_match_version() -> Optional[int]:
+    """
+    解析 If-Match 请求头中的版本号（由 version_etag 生成）。
+    未提供或为 * 时返回 None，表示不做版本校验。
+    格式错误（多个值 / 不是版本号）是请求错误（400）；版本不一致的 412 由调用方在比较版本时返回
+    """
+    if_match = request.if_match
+    if not if_match or if_match.star_tag:
+        return None
+    etags = if_match.as_set()
+    if len(etags) != 1:
+        raise BadRequestError("If-Match must contain exactly one version")
+    try:
+        return int(next(iter(etags)).split(".", 1)[0])
+    except ValueError:
+        raise BadRequestError("Invalid If-Match version")
@@ -1,28 +1,26 @@
-from datetime import datetime, date
+import orjson
 from bson import ObjectId
+from flask import make_response
+from app.extensions.metrics.tracing import span
 
 
-def process_data(data):
-    """
-    递归处理数据中的复杂类型，转换为JSON可序列化格式
-    支持：字典、列表、datetime、date、ObjectId等
-    """
-    # 1. 如果是字典，递归处理每个值
-    if isinstance(data, dict):
-        return {k: process_data(v) for k, v in data.items()}
+def _default(obj):
+    """orjson 无法直接处理的类型（datetime / date / enum 已原生支持）"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Type {type(obj)} is not JSON serializable")
 
-    # 2. 如果是列表/元组，递归处理每个元素
-    elif isinstance(data, (list, tuple)):
-        return [process_data(item) for item in data]
 
-    # 3. 处理日期时间类型（包括MongoDB的bson.datetime）
-    elif isinstance(data, (datetime, date)):
-        return data.isoformat()
+def dumps(data) -> bytes:
+    """一次遍历把 model_dump() 的结果或 Mongo 原始文档直接编码为 JSON bytes"""
+    return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
 
-    # 4. 处理MongoDB的ObjectId
-    elif isinstance(data, ObjectId):
-        return str(data)
 
-    # 5. 其他基础类型（字符串、数字等）直接返回
-    else:
-        return data
\ No newline at end of file
+def output_json(data, code, headers=None):
+    """Flask-RESTful representation for application/json, based on `dumps`"""
+    with span("serialize"):
+        body = dumps(data)
+    resp = make_response(body, code)
+    resp.headers.extend(headers or {})
+    resp.headers["Content-Type"] = "application/json"
+    return resp
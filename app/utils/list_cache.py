@@ -0,0 +1,80 @@
+import time
+from typing import Callable, Optional
+from flask import current_app, request, Response
+from app.extensions.db.db_redis import tiered_cache as cache
+from app.extensions.metrics.tracing import span
+from app.utils.etag import not_modified
+
+
+def _generation_key(list_id: str) -> str:
+    return f"list_gen:{list_id}"
+
+
+def get_list_generation(list_id: str):
+    """
+    当前列表的缓存代数（generation tag），所有该列表的响应缓存 key 都带上它。
+    key 丢失时用时间戳重新初始化，避免与旧代数的缓存冲突
+    """
+    key = _generation_key(list_id)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns(), timeout=current_app.config["RESPONSE_CACHE_TIMEOUT"])
+        generation = cache.get(key)
+    return generation
+
+
+def bump_list_generation(list_id: str) -> None:
+    """列表或其事项发生写操作后调用，一次性让该列表所有过滤/排序变体的缓存失效"""
+    cache.set(_generation_key(list_id), time.time_ns(), timeout=current_app.config["RESPONSE_CACHE_TIMEOUT"])
+
+
+class ResponseKeys:
+    """
+    当前请求的响应体 / ETag 缓存 key，只在请求开始时读取一次列表代数。
+    build() 期间发生的写操作会更新代数，旧代数下构建的响应体只会写到旧 key，不会被新代数的请求读到
+    """
+    __slots__ = ("body", "etag")
+
+    def __init__(self, list_id: str, generation=None):
+        if generation is None:
+            generation = get_list_generation(list_id)
+        # path + 排序后的 query 参数，保证同一请求的不同参数顺序命中同一个 key
+        args = "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+        suffix = f"{list_id}:{generation}:{request.path}?{args}"
+        self.body = f"resp:{suffix}"
+        self.etag = f"etag:{suffix}"
+
+
+def get_cached_response(keys: ResponseKeys):
+    """读取当前请求的缓存响应体，未命中返回 None"""
+    return cache.get(keys.body)
+
+
+def cache_response(keys: ResponseKeys, body: dict, etag: Optional[str] = None) -> dict:
+    """缓存已序列化的响应体；带 etag 时单独缓存一份，304 判断只需读这个小 key"""
+    timeout = current_app.config["RESPONSE_CACHE_TIMEOUT"]
+    cache.set(keys.body, body, timeout=timeout)
+    if etag:
+        cache.set(keys.etag, etag, timeout=timeout)
+    return body
+
+
+def cached_response(keys: ResponseKeys, build: Callable[[], dict],
+                    etag_of: Optional[Callable[[dict], str]] = None) -> dict:
+    """读取缓存，未命中时调用 build 生成响应体并写入缓存（etag_of 从响应体计算 ETag）"""
+    body = get_cached_response(keys)
+    if body is None:
+        with span("build"):
+            body = build()
+        cache_response(keys, body, etag_of(body) if etag_of else None)
+    return body
+
+
+def cached_not_modified(keys: ResponseKeys) -> Optional[Response]:
+    """
+    If-None-Match 与缓存的 ETag 一致时返回 304，不读 Mongo、不重建响应体。
+    缓存的 ETag 随列表代数失效，所以不会对已修改的资源返回 304
+    """
+    if not request.if_none_match:
+        return None
+    return not_modified(cache.get(keys.etag))
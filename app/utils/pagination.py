@@ -0,0 +1,69 @@
+import base64
+import json
+from datetime import datetime
+from typing import Dict, Optional
+from flask import current_app
+from app.utils.errors import BadRequestError
+
+
+def _encode_value(v):
+    # datetime 需要带类型标记，解码时才能还原为 datetime 参与比较
+    if isinstance(v, datetime):
+        return {"$date": v.isoformat()}
+    raise TypeError(f"Type {type(v)} is not cursor serializable")
+
+
+# 游标中只允许出现的值类型（datetime 由 $date 标记还原）；其他 dict 会被 mongo 当作查询操作符
+_CURSOR_SCALARS = (str, int, float, datetime, type(None))
+
+
+def _is_cursor_value(v) -> bool:
+    if isinstance(v, list):
+        return all(isinstance(x, _CURSOR_SCALARS) for x in v)
+    return isinstance(v, _CURSOR_SCALARS)
+
+
+def _decode_value(obj: dict):
+    if set(obj.keys()) == {"$date"}:
+        return datetime.fromisoformat(obj["$date"])
+    return obj
+
+
+def encode_cursor(payload: dict) -> str:
+    """把游标内容编码为不透明的 url-safe 字符串"""
+    raw = json.dumps(payload, default=_encode_value, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], schema: Optional[Dict[str, type]] = None) -> Optional[dict]:
+    """
+    解析客户端传回的游标，非法游标返回 400。
+    schema 为 {key: 类型}，缺少 key 或值类型不符时同样返回 400，调用方可以直接按 key 取值。
+    值只能是标量 / datetime / null 或它们的列表，游标的值会直接拼进 mongo 查询条件
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()), object_hook=_decode_value)
+    except (ValueError, TypeError):
+        raise BadRequestError("Invalid cursor")
+    if not isinstance(payload, dict) or not all(_is_cursor_value(v) for v in payload.values()):
+        raise BadRequestError("Invalid cursor")
+    for key, expected in (schema or {}).items():
+        if not isinstance(payload.get(key), expected):
+            raise BadRequestError("Invalid cursor")
+    return payload
+
+
+def get_page_limit(raw: Optional[str]) -> int:
+    """解析 limit 参数，限制在 [1, MAX_PAGE_SIZE] 区间"""
+    if raw is None or raw == "":
+        return current_app.config["DEFAULT_PAGE_SIZE"]
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise BadRequestError("limit must be an integer")
+    if limit < 1:
+        raise BadRequestError("limit must be greater than 0")
+    return min(limit, current_app.config["MAX_PAGE_SIZE"])
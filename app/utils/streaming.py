@@ -0,0 +1,51 @@
+import time
+import zlib
+from typing import Iterable, Iterator
+from app.extensions.db.change_feed import ChangeFeed, Subscriber, PERMISSIONS_REVOKED
+from app.utils.json_encoder import dumps
+
+
+def ndjson_chunks(rows: Iterable, batch_size: int) -> Iterator[bytes]:
+    """每 batch_size 行合并成一个 chunk 输出，减少 yield 次数，内存只保留一批"""
+    buffer = []
+    for row in rows:
+        buffer.append(dumps(row.model_dump()))
+        if len(buffer) >= batch_size:
+            yield b"\n".join(buffer) + b"\n"
+            buffer = []
+    if buffer:
+        yield b"\n".join(buffer) + b"\n"
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """增量 gzip 压缩（wbits=31 输出 gzip 格式）"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def sse_event(event: dict) -> bytes:
+    return b"event: " + event["type"].encode() + b"\ndata: " + dumps(event) + b"\n\n"
+
+
+def sse_chunks(feed: ChangeFeed, subscriber: Subscriber, heartbeat: float, max_duration: float) -> Iterator[bytes]:
+    """
+    把订阅者收到的事件编码为 text/event-stream，空闲时每 heartbeat 秒发送注释行保活（同时探测断开的连接），
+    超过 max_duration、列表被删除或当前用户的权限被回收时结束，客户端断开时由 finally 取消订阅
+    """
+    deadline = time.monotonic() + max_duration
+    try:
+        yield b"retry: 3000\n\n"
+        while time.monotonic() < deadline:
+            event = subscriber.get(timeout=heartbeat)
+            if event is None:
+                yield b": keepalive\n\n"
+                continue
+            yield sse_event(event)
+            if event["type"] in ("list.deleted", PERMISSIONS_REVOKED):
+                break
+    finally:
+        feed.unsubscribe(subscriber)
@@ -0,0 +1,53 @@
+"""
+Benchmark: login (bcrypt verify) throughput vs cost factor, on the request thread vs in the process pool
+Usage:
+    python -m scripts.bench_password_hashing [concurrency] [logins_per_cost]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.extensions.hashing.password_hasher import PasswordHasher
+from app.utils.errors import ServiceUnavailableError
+
+COSTS = (8, 10, 12)
+PASSWORD = "Test123!"
+
+
+def run(hasher: PasswordHasher, password_hash: str, concurrency: int, logins: int):
+    """`concurrency` request threads performing `logins` verifications, returns (logins/s, rejected)"""
+    rejected = 0
+
+    def login(_):
+        nonlocal rejected
+        try:
+            assert hasher.verify(PASSWORD, password_hash)
+        except ServiceUnavailableError:
+            rejected += 1
+
+    hasher.verify(PASSWORD, password_hash)  # warm up (starts the pool)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(login, range(logins)))
+    elapsed = time.perf_counter() - start
+    return (logins - rejected) / elapsed, rejected
+
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    logins = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    pool_size = os.cpu_count() or 1
+    print(f"concurrency={concurrency} logins={logins} pool_size={pool_size}")
+    print(f"{'cost':>4} {'mode':>8} {'logins/s':>10} {'ms/login':>9} {'rejected':>9}")
+    hasher = PasswordHasher()
+    for cost in COSTS:
+        for mode, size, max_pending in (("inline", 0, 0), ("pool", pool_size, logins)):
+            hasher.configure(rounds=cost, pool_size=size, max_pending=max_pending, timeout=60)
+            password_hash = hasher.hash(PASSWORD)
+            throughput, rejected = run(hasher, password_hash, concurrency, logins)
+            print(f"{cost:>4} {mode:>8} {throughput:>10.1f} {1000 / throughput:>9.1f} {rejected:>9}")
+    hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: stdlib json.dumps vs json_encoder.dumps (orjson)
+Usage:
+    python -m scripts.bench_serialization [n_items]
+"""
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from app.models.todos import TodoItem, TodoStatus, TodoPriority
+from app.utils.json_encoder import dumps
+
+
+def build_items(n: int):
+    now = datetime.utcnow()
+    return [TodoItem(
+        list_id="list_bench",
+        title=f"Task {i}",
+        description="benchmark item " * 5,
+        due_date=now + timedelta(days=i % 30),
+        status=list(TodoStatus)[i % 3],
+        priority=list(TodoPriority)[i % 3],
+        tags=["bench", f"tag{i % 10}"]
+    ) for i in range(n)]
+
+
+def _stdlib_default(obj):
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Type {type(obj)} is not JSON serializable")
+
+
+def stdlib_path(items):
+    return json.dumps({"code": 200, "data": [item.model_dump() for item in items]}, default=_stdlib_default).encode()
+
+
+def orjson_path(items):
+    return dumps({"code": 200, "data": [item.model_dump() for item in items]})
+
+
+def measure(name, func, items, rounds=5):
+    func(items)  # warm up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(items)
+    elapsed = (time.perf_counter() - start) / rounds
+
+    tracemalloc.start()
+    func(items)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<28} {elapsed * 1000:9.1f} ms/op   peak alloc {peak / 1024 / 1024:7.2f} MiB")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    items = build_items(n)
+    print(f"{n} items")
+    measure("json.dumps", stdlib_path, items)
+    measure("json_encoder.dumps", orjson_path, items)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Bulk import todo items from an NDJSON / CSV file (streaming, resumable)
+Usage:
+    python -m scripts.import_items --list-id <list_id> --file items.ndjson [--format ndjson|csv] [--import-id <id>]
+Re-run with the same --import-id to resume an interrupted import from its last checkpoint.
+"""
+import argparse
+import json
+import os
+import uuid
+from app import create_app
+from app.services.import_service import IMPORT_FORMATS, build_import_service, iter_rows
+from app.services.todo_service import TodoListService
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Bulk import todo items")
+    parser.add_argument("--list-id", required=True)
+    parser.add_argument("--file", required=True)
+    parser.add_argument("--format", choices=IMPORT_FORMATS)
+    parser.add_argument("--import-id")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    fmt = args.format or ("csv" if args.file.lower().endswith(".csv") else "ndjson")
+    import_id = args.import_id or f"import_{uuid.uuid4().hex}"
+
+    app = create_app()
+    with app.app_context():
+        if not TodoListService(app.mongo_db["todo_lists"]).list_exists(args.list_id):
+            raise SystemExit(f"List {args.list_id} not found")
+        service = build_import_service(app, app.mongo_db["todo_items"])
+        print(f"Importing {os.path.basename(args.file)} as {import_id}")
+        with open(args.file, "rb") as stream:
+            report = service.run(import_id, args.list_id, iter_rows(stream, fmt))
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
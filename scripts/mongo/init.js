@@ -40,4 +40,4 @@ db.todo_items.insertOne({
     created_at: new Date(),
     updated_at: new Date()
 });
-db.todo_items.createIndex({ list_id: 1 });
\ No newline at end of file
+// indexes are created by the api on startup, see app/extensions/db/mongo_indexes.py
\ No newline at end of file
@@ -17,6 +17,8 @@ CREATE TABLE permissions (
     granted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     UNIQUE(list_id, user_id)
 );
+-- 按用户 keyset 分页列出可访问的列表
+CREATE INDEX ix_permissions_user_id_list_id ON permissions (user_id, list_id);
 
 -- 插入测试用户（密码：test123）
 INSERT INTO users (email, password_hash, full_name, role)
@@ -1,3 +1,4 @@
+import json
 import requests
 import pytest
 from tests.utils import test_data_manager
@@ -599,3 +600,201 @@ def test_todo_item_sort_by_due_date():
     assert result["code"] == 200
     assert len(result["data"]) == 2
     assert result["data"][0]["title"] == "Earlier Task"  # 应该按日期升序排列
+
+
+def test_todo_item_get_all_paginated():
+    """用例ITEM-PAGE-001：按截止日期排序并使用游标分页"""
+    auth_headers = create_test_user("test_user", "test_page_items@example.com", "Test123!", "Test Page User")
+    list_id = create_test_list(auth_headers, "test_list", "Test List")
+
+    for title, due_date in [("Task A", "2024-01-01"), ("Task B", "2024-01-01"), ("Task C", "2024-03-01")]:
+        requests.post(f"{BASE_URL}/lists/{list_id}/items", headers=auth_headers, json={
+            "title": title, "due_date": due_date
+        })
+
+    titles = []
+    cursor = ""
+    while True:
+        response = requests.get(f"{BASE_URL}/lists/{list_id}/items?sort_by=due_date&limit=2&cursor={cursor}",
+                                headers=auth_headers)
+        result = response.json()
+        assert response.status_code == 200
+        assert len(result["data"]) <= 2
+        titles.extend(item["title"] for item in result["data"])
+        cursor = result["pagination"]["next_cursor"]
+        if not cursor:
+            break
+
+    # 每个事项只出现一次，且按日期升序
+    assert len(titles) == 3
+    assert titles[-1] == "Task C"
+
+
+def test_todo_item_update_stale_version():
+    """用例ITEM-UPD-005：使用过期的 If-Match 版本更新待办事项"""
+    auth_headers = create_test_user("test_user", "test_if_match@example.com", "Test123!", "Test If Match User")
+    list_id = create_test_list(auth_headers, "test_list", "Test List")
+
+    create_res = requests.post(f"{BASE_URL}/lists/{list_id}/items", headers=auth_headers, json={"title": "Task"})
+    assert create_res.status_code == 201
+    item_id = create_res.json()["data"]["item_id"]
+
+    get_res = requests.get(f"{BASE_URL}/lists/{list_id}/items/{item_id}", headers=auth_headers)
+    etag = get_res.headers["ETag"]
+
+    # 第一次更新成功，版本号 +1
+    response = requests.put(f"{BASE_URL}/lists/{list_id}/items/{item_id}",
+                            headers={**auth_headers, "If-Match": etag},
+                            json={"title": "First Edit"})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+    # 使用旧版本再次更新，返回 412
+    response = requests.put(f"{BASE_URL}/lists/{list_id}/items/{item_id}",
+                            headers={**auth_headers, "If-Match": etag},
+                            json={"title": "Second Edit"})
+    result = response.json()
+    assert response.status_code == 412
+    assert result["code"] == 412
+
+
+def test_todo_item_bulk_create():
+    """用例ITEM-BULK-001：批量创建待办事项，无效项单独报错"""
+    auth_headers = create_test_user("test_user", "test_bulk_create@example.com", "Test123!", "Test Bulk User")
+    list_id = create_test_list(auth_headers, "test_list", "Test List")
+
+    response = requests.post(f"{BASE_URL}/lists/{list_id}/items/bulk", headers=auth_headers, json={
+        "items": [
+            {"title": "Bulk Task 1", "priority": "High"},
+            {"title": "Bulk Task 2"},
+            {"description": "missing title"}
+        ]
+    })
+    result = response.json()
+    assert response.status_code == 207
+    assert [r["code"] for r in result["data"]] == [201, 201, 400]
+
+    response = requests.get(f"{BASE_URL}/lists/{list_id}/items", headers=auth_headers)
+    assert len(response.json()["data"]) == 2
+
+
+def test_todo_item_bulk_create_body_shapes():
+    """用例ITEM-BULK-003：批量创建接受顶层数组，非对象 / 数组的请求体返回 400"""
+    auth_headers = create_test_user("test_user", "test_bulk_shapes@example.com", "Test123!", "Test Bulk User")
+    list_id = create_test_list(auth_headers, "test_list", "Test List")
+
+    response = requests.post(f"{BASE_URL}/lists/{list_id}/items/bulk", headers=auth_headers,
+                             json=[{"title": "Array Task"}])
+    assert response.status_code == 201
+    assert [r["code"] for r in response.json()["data"]] == [201]
+
+    for body in ("not an object", 42, None):
+        response = requests.post(f"{BASE_URL}/lists/{list_id}/items/bulk", headers=auth_headers, json=body)
+        assert response.status_code == 400
+
+
+def test_todo_item_bulk_update_and_delete():
+    """用例ITEM-BULK-002：按过滤条件批量更新、批量删除待办事项"""
+    auth_headers = create_test_user("test_user", "test_bulk_update@example.com", "Test123!", "Test Bulk User")
+    list_id = create_test_list(auth_headers, "test_list", "Test List")
+
+    requests.post(f"{BASE_URL}/lists/{list_id}/items/bulk", headers=auth_headers, json={
+        "items": [{"title": f"Task {i}", "status": "In Progress"} for i in range(3)]
+    })
+
+    # 非法的状态值返回 400
+    response = requests.patch(f"{BASE_URL}/lists/{list_id}/items", headers=auth_headers, json={
+        "filter": {"status": "In Progress"},
+        "update": {"status": "Bogus"}
+    })
+    assert response.status_code == 400
+
+    # 全部标记为已完成
+    response = requests.patch(f"{BASE_URL}/lists/{list_id}/items", headers=auth_headers, json={
+        "filter": {"status": "In Progress"},
+        "update": {"status": "Completed"}
+    })
+    result = response.json()
+    assert response.status_code == 200
+    assert result["data"] == {"matched": 3, "modified": 3}
+
+    # 清理已完成事项
+    response = requests.delete(f"{BASE_URL}/lists/{list_id}/items", headers=auth_headers, json={
+        "filter": {"status": "Completed"}
+    })
+    result = response.json()
+    assert response.status_code == 200
+    assert result["data"]["deleted"] == 3
+
+
+def test_todo_item_export_ndjson():
+    """用例ITEM-EXPORT-001：以 NDJSON 流导出列表中的所有待办事项"""
+    auth_headers = create_test_user("test_user", "test_export@example.com", "Test123!", "Test Export User")
+    list_id = create_test_list(auth_headers, "test_list", "Test List")
+
+    requests.post(f"{BASE_URL}/lists/{list_id}/items/bulk", headers=auth_headers, json={
+        "items": [{"title": f"Task {i}"} for i in range(5)]
+    })
+
+    response = requests.get(f"{BASE_URL}/lists/{list_id}/items/export", headers=auth_headers, stream=True)
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("application/x-ndjson")
+    lines = [line for line in response.iter_lines() if line]
+    assert len(lines) == 5
+
+
+def test_todo_item_import_resumable():
+    """用例ITEM-IMPORT-001：NDJSON 导入，报告逐行错误，同一 import_id 重复提交不会重复写入"""
+    auth_headers = create_test_user("test_user", "test_import@example.com", "Test123!", "Test Import User")
+    list_id = create_test_list(auth_headers, "test_list", "Test List")
+
+    body = "\n".join([json.dumps({"title": f"Task {i}"}) for i in range(3)] + ['{"title": ""}'])
+    url = f"{BASE_URL}/lists/{list_id}/items/import?format=ndjson&import_id=test_import_1"
+    response = requests.post(url, headers=auth_headers, data=body.encode())
+    assert response.status_code == 200
+    report = response.json()["data"]
+    assert report["inserted"] == 3
+    assert report["failed"] == 1
+    assert report["errors"][0]["row"] == 4
+
+    response = requests.post(url, headers=auth_headers, data=body.encode())
+    assert response.json()["data"]["inserted"] == 0
+
+    response = requests.get(f"{BASE_URL}/lists/{list_id}/items", headers=auth_headers)
+    assert len(response.json()["data"]) == 3
+
+
+def test_todo_item_delta_sync():
+    """用例ITEM-SYNC-001：since 游标只返回变更的事项和已删除事项的 id"""
+    auth_headers = create_test_user("test_user", "test_sync@example.com", "Test123!", "Test Sync User")
+    list_id = create_test_list(auth_headers, "test_list", "Test List")
+    response = requests.post(f"{BASE_URL}/lists/{list_id}/items", headers=auth_headers, json={"title": "Task 1"})
+    item_id = response.json()["data"]["item_id"]
+
+    response = requests.get(f"{BASE_URL}/lists/{list_id}/items?since=", headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["item_id"] for item in body["data"]] == [item_id]
+    assert body["sync"]["has_more"] is False
+    since = body["sync"]["next_since"]
+
+    requests.delete(f"{BASE_URL}/lists/{list_id}/items/{item_id}", headers=auth_headers)
+
+    response = requests.get(f"{BASE_URL}/lists/{list_id}/items?since={since}", headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert item_id in body["deleted"]
+    assert all(item["item_id"] != item_id for item in body["data"])
+
+
+def test_todo_item_get_no_server_timing_for_users():
+    """用例ITEM-TRACE-001：Server-Timing 只发给 ADMIN token，普通用户的响应不暴露各层耗时"""
+    auth_headers = create_test_user("test_user",
+                                    "test_server_timing@example.com",
+                                    "Test123!",
+                                    "Test Server Timing User")
+    list_id = create_test_list(auth_headers, "test_list", "Test List")
+
+    response = requests.get(f"{BASE_URL}/lists/{list_id}/items", headers=auth_headers)
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
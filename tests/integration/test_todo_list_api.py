@@ -1,3 +1,4 @@
+import os
 import time
 
 import requests
@@ -525,3 +526,139 @@ def test_cross_user_data_isolation():
     user2_lists_data = user2_lists.json()["data"]
     assert len(user2_lists_data) == 1
     assert user2_lists_data[0]["list_id"] == user2_list_id
+
+
+def test_todo_list_get_all_paginated():
+    """用例LIST-GET-004：分页查询列表，使用游标翻页"""
+    auth_headers = create_test_user("test_user", "test_page_lists@example.com", "Test123!", "Test Page User")
+
+    for i in range(3):
+        response = requests.post(f"{BASE_URL}/lists", headers=auth_headers, json={"title": f"List {i}"})
+        assert response.status_code == 201
+
+    # 第一页
+    response = requests.get(f"{BASE_URL}/lists?limit=2", headers=auth_headers)
+    result = response.json()
+    assert response.status_code == 200
+    assert len(result["data"]) == 2
+    next_cursor = result["pagination"]["next_cursor"]
+    assert next_cursor
+
+    # 第二页
+    response = requests.get(f"{BASE_URL}/lists?limit=2&cursor={next_cursor}", headers=auth_headers)
+    result = response.json()
+    assert response.status_code == 200
+    assert len(result["data"]) == 1
+    assert result["pagination"]["next_cursor"] is None
+
+    # 非法游标
+    response = requests.get(f"{BASE_URL}/lists?cursor=not-a-cursor", headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_todo_list_get_not_modified():
+    """用例LIST-GET-005：If-None-Match 与当前 ETag 一致时返回 304，修改后返回新内容"""
+    auth_headers = create_test_user("test_user",
+                                    "test_not_modified@example.com",
+                                    "Test123!",
+                                    "Test Not Modified User")
+    create_res = requests.post(url=f"{BASE_URL}/lists", headers=auth_headers, json={"title": "Cached List"})
+    list_id = create_res.json()["data"]["list_id"]
+    test_data_manager.save_list_id("cached_list", list_id)
+
+    response = requests.get(f"{BASE_URL}/lists/{list_id}", headers=auth_headers)
+    etag = response.headers["ETag"]
+
+    response = requests.get(f"{BASE_URL}/lists/{list_id}", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    requests.put(f"{BASE_URL}/lists/{list_id}", headers=auth_headers, json={"title": "Renamed List"})
+    response = requests.get(f"{BASE_URL}/lists/{list_id}", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["data"]["title"] == "Renamed List"
+
+
+def test_todo_list_change_feed():
+    """用例LIST-SSE-001：订阅列表的变更事件流，修改列表后收到 list.updated 事件"""
+    auth_headers = create_test_user("test_user",
+                                    "test_change_feed@example.com",
+                                    "Test123!",
+                                    "Test Change Feed User")
+    create_res = requests.post(url=f"{BASE_URL}/lists", headers=auth_headers, json={"title": "Shared List"})
+    list_id = create_res.json()["data"]["list_id"]
+    test_data_manager.save_list_id("shared_list", list_id)
+
+    with requests.get(f"{BASE_URL}/lists/{list_id}/events", headers=auth_headers, stream=True, timeout=10) as stream:
+        assert stream.status_code == 200
+        assert stream.headers["Content-Type"].startswith("text/event-stream")
+        requests.put(f"{BASE_URL}/lists/{list_id}", headers=auth_headers, json={"title": "Renamed"})
+        events = []
+        for line in stream.iter_lines(decode_unicode=True):
+            if line.startswith("event: "):
+                events.append(line[len("event: "):])
+                break
+    assert events == ["list.updated"]
+
+
+def test_todo_list_item_counts():
+    """用例LIST-GET-006：列表返回按状态统计的事项数量，随事项的增删改更新"""
+    auth_headers = create_test_user("test_user",
+                                    "test_counts@example.com",
+                                    "Test123!",
+                                    "Test Counts User")
+    create_res = requests.post(url=f"{BASE_URL}/lists", headers=auth_headers, json={"title": "Counted List"})
+    list_id = create_res.json()["data"]["list_id"]
+    test_data_manager.save_list_id("counted_list", list_id)
+
+    item_ids = []
+    for title in ("Task 1", "Task 2"):
+        res = requests.post(f"{BASE_URL}/lists/{list_id}/items", headers=auth_headers, json={"title": title})
+        item_ids.append(res.json()["data"]["item_id"])
+    requests.put(f"{BASE_URL}/lists/{list_id}/items/{item_ids[0]}", headers=auth_headers,
+                 json={"status": "Completed"})
+
+    response = requests.get(f"{BASE_URL}/lists/{list_id}", headers=auth_headers)
+    counts = response.json()["data"]["counts"]
+    assert counts["total"] == 2
+    assert counts["completed"] == 1
+    assert counts["not_started"] == 1
+
+    requests.delete(f"{BASE_URL}/lists/{list_id}/items/{item_ids[1]}", headers=auth_headers)
+    response = requests.get(f"{BASE_URL}/lists", headers=auth_headers)
+    counts = next(l["counts"] for l in response.json()["data"] if l["list_id"] == list_id)
+    assert counts["total"] == 1
+    assert counts["not_started"] == 0
+
+
+def test_metrics_endpoint():
+    """用例METRICS-001：/metrics 只对 METRICS_TOKEN / ADMIN 开放，以 prometheus 文本格式输出按资源统计的延迟和数据库调用"""
+    auth_headers = create_test_user("test_user",
+                                    "test_metrics@example.com",
+                                    "Test123!",
+                                    "Test Metrics User")
+    requests.get(f"{BASE_URL}/lists", headers=auth_headers)
+    metrics_url = BASE_URL.replace("/api", "/metrics")
+
+    assert requests.get(metrics_url).status_code == 401
+    assert requests.get(metrics_url, headers=auth_headers).status_code == 403
+
+    token = os.getenv("METRICS_TOKEN")
+    if not token:
+        pytest.skip("METRICS_TOKEN is not set for the test server")
+    response = requests.get(metrics_url, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_bucket{endpoint="todolistcollection",method="GET"' in response.text
+    assert "mongo_commands_total" in response.text
+
+
+def test_profile_flag_ignored_for_non_admin():
+    """用例PROFILE-001：普通用户带 _profile 参数时按普通请求处理，不做 profile"""
+    auth_headers = create_test_user("test_user",
+                                    "test_profile@example.com",
+                                    "Test123!",
+                                    "Test Profile User")
+    response = requests.get(f"{BASE_URL}/lists", headers=auth_headers, params={"_profile": "cprofile"})
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers